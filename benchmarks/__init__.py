@@ -0,0 +1,5 @@
+"""
+Benchmark suite for MinHeap, heapsort and DynamicArray.
+
+Run from the repository root with:  python -m benchmarks --help
+"""
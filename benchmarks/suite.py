@@ -0,0 +1,412 @@
+import argparse
+import heapq
+import json
+import os
+import platform
+import random
+import time
+
+from dynamic_array import *
+from min_heap import *
+from pairing_heap import PairingHeap
+from parallel_sort import parallel_heapsort
+from radix_heap import RadixHeap
+
+
+# Sizes and input orders used when none are given on the command line
+DEFAULT_SIZES = [10 ** 2, 10 ** 3, 10 ** 4, 10 ** 5]
+INPUTS = ['random', 'sorted', 'reverse', 'duplicates']
+
+# Cases that are quadratic in the input size are capped at this size
+QUADRATIC_LIMIT = 10 ** 4
+
+
+def make_input(kind: str, size: int, seed: int) -> list:
+    """
+    Returns a list of size ints in the requested order, reproducible for a
+    given seed.
+    """
+    rng = random.Random(seed)
+    if kind == 'duplicates':
+        return [rng.randrange(max(1, size // 100)) for _ in range(size)]
+    values = [rng.randrange(size * 10) for _ in range(size)]
+    if kind == 'sorted':
+        values.sort()
+    elif kind == 'reverse':
+        values.sort(reverse=True)
+    return values
+
+
+# ---------------------------------------------------------------------------
+# Each case is a pair of functions: setup(values) returns the state that the
+# timed run(state) call works on, so only run() is measured.
+
+def _heap_add(arity):
+    def setup(values):
+        return MinHeap.from_iterable(arity=arity), values
+
+    def run(state):
+        heap, values = state
+        for value in values:
+            heap.add(value)
+    return setup, run
+
+
+def _heap_remove_min(arity, bottom_up=False):
+    def setup(values):
+        return MinHeap.from_iterable(values, bottom_up=bottom_up, arity=arity)
+
+    def run(heap):
+        for _ in range(heap.size()):
+            heap.remove_min()
+    return setup, run
+
+
+def _heapsort(bottom_up=False, arity=2):
+    def setup(values):
+        return DynamicArray(values)
+
+    def run(da):
+        heapsort(da, bottom_up, arity)
+    return setup, run
+
+
+def _parallel_heapsort(workers):
+    def setup(values):
+        return DynamicArray(values)
+
+    def run(da):
+        parallel_heapsort(da, workers)
+    return setup, run
+
+
+def _build_heap(values):
+    return MinHeap(), DynamicArray(values)
+
+
+def _da_from(values):
+    return DynamicArray(values)
+
+
+def _da_pair(values):
+    return DynamicArray(values), DynamicArray(values)
+
+
+def _da_insert_front(values):
+    da = DynamicArray()
+    for value in values:
+        da.insert_at_index(0, value)
+
+
+def _da_remove_front(da):
+    for _ in range(da.length()):
+        da.remove_at_index(0)
+
+
+def _da_slice(da):
+    da.slice(0, da.length())
+
+
+def _find_mode(da):
+    find_mode(da)
+
+
+def _heapq_push(values):
+    heap = []
+    for value in values:
+        heapq.heappush(heap, value)
+
+
+def _heapq_pop(heap):
+    for _ in range(len(heap)):
+        heapq.heappop(heap)
+
+
+def _heapified(values):
+    heap = list(values)
+    heapq.heapify(heap)
+    return heap
+
+
+def _list_append(values):
+    items = []
+    for value in values:
+        items.append(value)
+
+
+def _list_insert_front(values):
+    items = []
+    for value in values:
+        items.insert(0, value)
+
+
+def _identity(values):
+    return values
+
+
+# Dijkstra's algorithm over a synthetic graph, once per heap backend.  Every
+# vertex u has an edge to u + 1 (so all vertices are reachable) and
+# DIJKSTRA_DEGREE - 1 edges to vertices picked from the input values, with
+# weights 1 to 100 derived from them.
+
+DIJKSTRA_DEGREE = 4
+
+
+def _graph(values):
+    size = len(values)
+    graph = []
+    for u in range(size):
+        edges = [((u + 1) % size, values[u] % 100 + 1)]
+        for k in range(1, DIJKSTRA_DEGREE):
+            value = values[(u * 7 + k * 13) % size]
+            edges.append((value % size, (value // size + k) % 100 + 1))
+        graph.append(edges)
+    return graph
+
+
+def _dijkstra_binary(graph):
+    # Addressable MinHeap with decrease_key
+    heap = MinHeap.from_iterable(addressable=True)
+    dist = [None] * len(graph)
+    handles = [None] * len(graph)
+    dist[0] = 0
+    handles[0] = heap.add(0, 0)
+    while not heap.is_empty():
+        u = heap.remove_min()
+        handles[u] = False
+        for v, weight in graph[u]:
+            alt = dist[u] + weight
+            if handles[v] is None:
+                dist[v] = alt
+                handles[v] = heap.add(v, alt)
+            elif handles[v] is not False and alt < dist[v]:
+                dist[v] = alt
+                heap.decrease_key(handles[v], alt)
+    return dist
+
+
+def _dijkstra_radix(graph):
+    # RadixHeap without decrease_key: stale entries are skipped when popped
+    heap = RadixHeap()
+    dist = [None] * len(graph)
+    done = [False] * len(graph)
+    dist[0] = 0
+    heap.add(0, 0)
+    while not heap.is_empty():
+        u = heap.remove_min()
+        if done[u]:
+            continue
+        done[u] = True
+        for v, weight in graph[u]:
+            alt = dist[u] + weight
+            if dist[v] is None or alt < dist[v]:
+                dist[v] = alt
+                heap.add(v, alt)
+    return dist
+
+
+def _dijkstra_pairing(graph):
+    # PairingHeap with decrease_key
+    heap = PairingHeap()
+    dist = [None] * len(graph)
+    handles = [None] * len(graph)
+    dist[0] = 0
+    handles[0] = heap.add(0, 0)
+    while not heap.is_empty():
+        u = heap.remove_min()
+        handles[u] = False
+        for v, weight in graph[u]:
+            alt = dist[u] + weight
+            if handles[v] is None:
+                dist[v] = alt
+                handles[v] = heap.add(v, alt)
+            elif handles[v] is not False and alt < dist[v]:
+                dist[v] = alt
+                heap.decrease_key(handles[v], alt)
+    return dist
+
+
+def _dijkstra_heapq(graph):
+    # heapq with lazy deletion, as a baseline
+    heap = [(0, 0)]
+    dist = [None] * len(graph)
+    done = [False] * len(graph)
+    dist[0] = 0
+    while heap:
+        d, u = heapq.heappop(heap)
+        if done[u]:
+            continue
+        done[u] = True
+        for v, weight in graph[u]:
+            alt = d + weight
+            if dist[v] is None or alt < dist[v]:
+                dist[v] = alt
+                heapq.heappush(heap, (alt, v))
+    return dist
+
+
+CASES = {
+    'heap_add': _heap_add(2),
+    'heap_add_arity4': _heap_add(4),
+    'heap_add_arity8': _heap_add(8),
+    'heap_remove_min': _heap_remove_min(2),
+    'heap_remove_min_bottom_up': _heap_remove_min(2, True),
+    'heap_remove_min_arity4': _heap_remove_min(4),
+    'heap_remove_min_arity8': _heap_remove_min(8),
+    'heap_build_heap': (_build_heap, lambda state: state[0].build_heap(state[1])),
+    'heap_start_heap': (_identity, MinHeap),
+    'heap_from_iterable': (_identity, MinHeap.from_iterable),
+    'heapsort': _heapsort(),
+    'heapsort_bottom_up': _heapsort(True),
+    'heapsort_arity4': _heapsort(False, 4),
+    'parallel_heapsort_w1': _parallel_heapsort(1),
+    'parallel_heapsort_w2': _parallel_heapsort(2),
+    'parallel_heapsort_w4': _parallel_heapsort(4),
+    'da_append': (_identity, DynamicArray),
+    'da_insert_at_index': (_identity, _da_insert_front),
+    'da_remove_at_index': (_da_from, _da_remove_front),
+    'da_slice': (_da_from, _da_slice),
+    'da_merge': (_da_pair, lambda state: state[0].merge(state[1])),
+    'da_find_mode': (lambda values: DynamicArray(sorted(values)), _find_mode),
+    'da_find_mode_unsorted': (_da_from, find_mode_unsorted),
+    'top_k_frequent': (_identity, lambda values: top_k_frequent(values, 10)),
+    'dijkstra_binary': (_graph, _dijkstra_binary),
+    'dijkstra_radix': (_graph, _dijkstra_radix),
+    'dijkstra_pairing': (_graph, _dijkstra_pairing),
+    'dijkstra_heapq': (_graph, _dijkstra_heapq),
+    'heapq_push': (_identity, _heapq_push),
+    'heapq_pop': (_heapified, _heapq_pop),
+    'heapq_heapify': (list, heapq.heapify),
+    'list_sorted': (_identity, sorted),
+    'list_append': (_identity, _list_append),
+    'list_insert_front': (_identity, _list_insert_front),
+}
+
+QUADRATIC_CASES = {'da_insert_at_index', 'da_remove_at_index', 'list_insert_front'}
+
+
+# ---------------------------------------------------------------------------
+
+def measure(case: str, values: list, repeat: int) -> float:
+    """
+    Returns the best time in seconds of repeat runs of a case.
+    """
+    setup, run = CASES[case]
+    best = None
+    for _ in range(repeat):
+        state = setup(values)
+        start = time.perf_counter()
+        run(state)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def run_suite(cases: list, sizes: list, inputs: list, repeat: int, seed: int, log=print) -> dict:
+    """
+    Runs every case for every size and input order and returns the results
+    with enough metadata to reproduce them.
+    """
+    results = []
+    for case in cases:
+        for size in sizes:
+            if case in QUADRATIC_CASES and size > QUADRATIC_LIMIT:
+                continue
+            for kind in inputs:
+                seconds = measure(case, make_input(kind, size, seed), repeat)
+                results.append({'case': case, 'size': size, 'input': kind, 'seconds': seconds})
+                log('%-28s %10d %-10s %.6f s' % (case, size, kind, seconds))
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'machine': platform.machine(),
+            'cpus': os.cpu_count(),
+            'seed': seed,
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Returns the results that are slower than the matching baseline result by
+    more than the tolerance (0.25 means 25% slower).
+    """
+    previous = {}
+    for result in baseline['results']:
+        previous[(result['case'], result['size'], result['input'])] = result['seconds']
+    regressions = []
+    for result in results['results']:
+        old = previous.get((result['case'], result['size'], result['input']))
+        if old is not None and result['seconds'] > old * (1 + tolerance):
+            regressions.append(dict(result, baseline=old))
+    return regressions
+
+
+def plot(results: dict, directory: str) -> bool:
+    """
+    Writes one log-log scaling plot per input order into directory.
+    Returns False if matplotlib is not installed.
+    """
+    try:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+    except ImportError:
+        return False
+
+    os.makedirs(directory, exist_ok=True)
+    for kind in sorted({result['input'] for result in results['results']}):
+        figure, axes = plt.subplots(figsize=(10, 7))
+        for case in sorted({result['case'] for result in results['results']}):
+            points = sorted((result['size'], result['seconds']) for result in results['results']
+                            if result['case'] == case and result['input'] == kind)
+            if points:
+                axes.plot([p[0] for p in points], [p[1] for p in points], marker='o', label=case)
+        axes.set_xscale('log')
+        axes.set_yscale('log')
+        axes.set_xlabel('size')
+        axes.set_ylabel('seconds')
+        axes.set_title('%s input' % kind)
+        axes.legend(fontsize='small', ncol=2)
+        figure.savefig(os.path.join(directory, 'scaling-%s.png' % kind), dpi=100)
+        plt.close(figure)
+    return True
+
+
+def main(argv: list = None) -> int:
+    """
+    Command line entry point.  Returns 1 if a regression against the
+    baseline was found, otherwise 0.
+    """
+    parser = argparse.ArgumentParser(prog='python -m benchmarks',
+                                     description='Benchmark MinHeap, heapsort and DynamicArray.')
+    parser.add_argument('--cases', nargs='+', choices=sorted(CASES), default=sorted(CASES))
+    parser.add_argument('--sizes', nargs='+', type=int, default=DEFAULT_SIZES)
+    parser.add_argument('--inputs', nargs='+', choices=INPUTS, default=INPUTS)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--plot', metavar='DIR', help='write scaling plots to this directory')
+    parser.add_argument('--baseline', help='compare against the results in this JSON file')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.cases, args.sizes, args.inputs, args.repeat, args.seed)
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+    if args.plot and not plot(results, args.plot):
+        print('matplotlib is not installed, skipping plots')
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for result in regressions:
+            print('REGRESSION %s size=%d input=%s: %.6f s (baseline %.6f s)' % (
+                result['case'], result['size'], result['input'], result['seconds'], result['baseline']))
+        if regressions:
+            return 1
+    return 0
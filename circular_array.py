@@ -0,0 +1,243 @@
+from static_array import StaticArray
+from dynamic_array import DynamicArrayException
+
+
+class CircularArray:
+    """
+    Dynamic array stored as a ring buffer: the elements start at a head offset
+    in the StaticArray and wrap around its end.  Adding or removing at either
+    end is O(1), and insert_at_index/remove_at_index shift only the elements
+    between the index and the nearer end.
+    """
+
+    def __init__(self, start_array=None):
+        """
+        Initialize new circular array
+        """
+        self._size = 0
+        self._capacity = 4
+        self._head = 0
+        self._data = StaticArray(self._capacity)
+
+        # populate circular array with initial values (if provided)
+        if start_array is not None:
+            for value in start_array:
+                self.append(value)
+
+    def __str__(self) -> str:
+        """
+        Return content of circular array in human-readable form
+        """
+        out = "CIRC_ARR Size/Cap: "
+        out += str(self._size) + "/" + str(self._capacity) + ' ['
+        out += ', '.join([str(value) for value in self])
+        return out + ']'
+
+    def __iter__(self):
+        """
+        Iterates over the elements from front to back.  Every iterator keeps
+        its own position.
+        """
+        for index in range(self._size):
+            yield self._data.get(self._physical(index))
+
+    def __len__(self) -> int:
+        return self._size
+
+    def get_at_index(self, index: int) -> object:
+        """
+        Return value from given index position
+        Invalid index raises DynamicArrayException
+        """
+        if index < 0 or index >= self._size:
+            raise DynamicArrayException
+        return self._data.get(self._physical(index))
+
+    def set_at_index(self, index: int, value: object) -> None:
+        """
+        Store value at given index in the array
+        Invalid index raises DynamicArrayException
+        """
+        if index < 0 or index >= self._size:
+            raise DynamicArrayException
+        self._data.set(self._physical(index), value)
+
+    def __getitem__(self, index) -> object:
+        return self.get_at_index(index)
+
+    def __setitem__(self, index, value) -> None:
+        self.set_at_index(index, value)
+
+    def is_empty(self) -> bool:
+        """
+        Return True is array is empty / False otherwise
+        """
+        return self._size == 0
+
+    def length(self) -> int:
+        """
+        Return number of elements stored in array
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return the capacity of the array
+        """
+        return self._capacity
+
+    # -----------------------------------------------------------------------
+
+    def resize(self, new_capacity: int) -> None:
+        """
+        Adjusts the capacity of the underlying storage.  The elements are
+        copied in order in one pass, which also unwraps them so the head
+        is at offset 0 again.
+        """
+        # The new capacity must hold every element and be positive
+        if new_capacity < self._size or new_capacity <= 0:
+            return
+        new_data = StaticArray(new_capacity)
+        load = self._data.get
+        store = new_data.set
+        # Copy the part from the head to the end of storage, then the wrapped part
+        first = min(self._size, self._capacity - self._head)
+        for index in range(first):
+            store(index, load(self._head + index))
+        for index in range(self._size - first):
+            store(first + index, load(index))
+        self._data = new_data
+        self._capacity = new_capacity
+        self._head = 0
+
+    def append(self, value: object) -> None:
+        """
+        Adds a new value to the back of the array in O(1) (amortized).
+        """
+        if self._size == self._capacity:
+            self.resize(self._capacity * 2)
+        self._data.set(self._physical(self._size), value)
+        self._size += 1
+
+    def appendleft(self, value: object) -> None:
+        """
+        Adds a new value to the front of the array in O(1) (amortized).
+        """
+        if self._size == self._capacity:
+            self.resize(self._capacity * 2)
+        self._head = (self._head - 1) % self._capacity
+        self._data.set(self._head, value)
+        self._size += 1
+
+    def pop(self) -> object:
+        """
+        Removes and returns the last value in O(1) (amortized).
+        If the array is empty, the method raises a DynamicArrayException.
+        """
+        if self._size == 0:
+            raise DynamicArrayException
+        position = self._physical(self._size - 1)
+        value = self._data.get(position)
+        self._data.set(position, None)
+        self._size -= 1
+        self._shrink()
+        return value
+
+    def popleft(self) -> object:
+        """
+        Removes and returns the first value in O(1) (amortized).
+        If the array is empty, the method raises a DynamicArrayException.
+        """
+        if self._size == 0:
+            raise DynamicArrayException
+        value = self._data.get(self._head)
+        self._data.set(self._head, None)
+        self._head = (self._head + 1) % self._capacity
+        self._size -= 1
+        self._shrink()
+        return value
+
+    def insert_at_index(self, index: int, value: object) -> None:
+        """
+        Adds a new value at a specified index, shifting the elements between
+        the index and the nearer end of the array.  If the index is invalid,
+        a DynamicArrayException will be raised.
+        """
+        if index < 0 or index > self._size:
+            raise DynamicArrayException
+        if self._size == self._capacity:
+            self.resize(self._capacity * 2)
+
+        load = self._data.get
+        store = self._data.set
+        physical = self._physical
+        if index < self._size // 2:
+            # Move the head back one slot and shift the front part left
+            self._head = (self._head - 1) % self._capacity
+            for position in range(index):
+                store(physical(position), load(physical(position + 1)))
+        else:
+            # Shift the back part right
+            for position in range(self._size, index, -1):
+                store(physical(position), load(physical(position - 1)))
+        store(physical(index), value)
+        self._size += 1
+
+    def remove_at_index(self, index: int) -> None:
+        """
+        Removes the element at a specified index, shifting the elements
+        between the index and the nearer end of the array.  If the index is
+        invalid, a DynamicArrayException will be raised.
+        """
+        if index < 0 or index >= self._size:
+            raise DynamicArrayException
+
+        load = self._data.get
+        store = self._data.set
+        physical = self._physical
+        if index < self._size // 2:
+            # Shift the front part right and move the head forward one slot
+            for position in range(index, 0, -1):
+                store(physical(position), load(physical(position - 1)))
+            store(self._head, None)
+            self._head = (self._head + 1) % self._capacity
+        else:
+            # Shift the back part left
+            for position in range(index, self._size - 1):
+                store(physical(position), load(physical(position + 1)))
+            store(physical(self._size - 1), None)
+        self._size -= 1
+        self._shrink()
+
+    def extend(self, iterable) -> None:
+        """
+        Appends every value of an iterable, growing the capacity at most once.
+        """
+        values = iterable if hasattr(iterable, '__len__') else list(iterable)
+        needed = self._size + len(values)
+        if needed > self._capacity:
+            capacity = self._capacity
+            while capacity < needed:
+                capacity *= 2
+            self.resize(capacity)
+        for value in values:
+            self._data.set(self._physical(self._size), value)
+            self._size += 1
+
+    def _physical(self, index: int) -> int:
+        """
+        Returns the storage position of a logical index.
+        """
+        position = self._head + index
+        if position >= self._capacity:
+            position -= self._capacity
+        return position
+
+    def _shrink(self) -> None:
+        """
+        Halves the storage towards twice the size when the array is less than
+        a quarter full, keeping a capacity of at least 10 (the same policy as
+        DynamicArray.remove_at_index).
+        """
+        if self._capacity > 10 and self._size < self._capacity / 4:
+            self.resize(max(10, self._size * 2))
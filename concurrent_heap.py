@@ -0,0 +1,211 @@
+import asyncio
+import collections
+import threading
+
+from min_heap import *
+
+
+class ConcurrentMinHeap:
+    """
+    Thread-safe priority queue around a MinHeap.  Every method takes the lock
+    once, so batched calls pay for a single acquisition.
+    """
+
+    def __init__(self, heap: MinHeap = None):
+        """
+        Wraps the passed heap, or a new empty MinHeap.  The heap must not be
+        used directly once it is wrapped.
+        """
+        self._heap = MinHeap() if heap is None else heap
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+
+    def __str__(self) -> str:
+        """
+        Return content of the wrapped heap in human-readable form
+        """
+        with self._lock:
+            return str(self._heap)
+
+    def __iter__(self):
+        """
+        Iterates over a snapshot of the stored nodes (in heap order) taken
+        under the lock, so each iterator has its own cursor and concurrent
+        readers do not interfere.  Cancelled nodes are left out.
+        """
+        with self._lock:
+            heap = self._heap
+            nodes = [heap._heap.get_at_index(index) for index in range(heap._heap.length())
+                     if not heap._is_dead(index)]
+        return iter(nodes)
+
+    def put(self, node: object, priority: object = None) -> object:
+        """
+        Adds a node and wakes one waiting get().  Returns whatever the heap's
+        add() returns (a HeapHandle in addressable mode).
+        """
+        with self._not_empty:
+            handle = self._heap.add(node, priority)
+            self._not_empty.notify()
+        return handle
+
+    def put_many(self, iterable) -> object:
+        """
+        Adds every value of an iterable under a single lock acquisition and
+        wakes as many waiting get() calls as values were added.  The iterable
+        is consumed before the lock is taken.
+        """
+        nodes = list(iterable)
+        with self._not_empty:
+            handles = self._heap.push_many(nodes)
+            self._not_empty.notify(len(nodes))
+        return handles
+
+    def get(self, block: bool = True, timeout: float = None) -> object:
+        """
+        Removes and returns the minimum.  If the heap is empty and block is
+        True, waits until a node is added or the timeout (in seconds) expires.
+        If no node is available, the method raises a MinHeapException.
+        """
+        with self._not_empty:
+            if self._heap.is_empty():
+                if not block or not self._not_empty.wait_for(self._has_nodes, timeout):
+                    raise MinHeapException
+            return self._heap.remove_min()
+
+    def get_many(self, k: int) -> DynamicArray:
+        """
+        Removes up to k minimum values under a single lock acquisition and
+        returns them in a DynamicArray in ascending order.
+        """
+        with self._lock:
+            return self._heap.pop_many(k)
+
+    def get_min(self) -> object:
+        """
+        Returns the minimum without removing it.
+        If the heap is empty, the method raises a MinHeapException.
+        """
+        with self._lock:
+            return self._heap.get_min()
+
+    def is_empty(self) -> bool:
+        """
+        Returns true if the heap is empty, otherwise will return False
+        """
+        with self._lock:
+            return self._heap.is_empty()
+
+    def size(self) -> int:
+        """
+        Returns the number of items currently stored in the heap.
+        """
+        with self._lock:
+            return self._heap.size()
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the heap.
+        """
+        with self._lock:
+            self._heap.clear()
+
+    def _has_nodes(self) -> bool:
+        """
+        Wait predicate, called with the lock held.
+        """
+        return not self._heap.is_empty()
+
+
+class AsyncMinHeap:
+    """
+    Priority queue around a MinHeap for use from a single asyncio event loop.
+    Each added node wakes exactly one waiting get().
+    """
+
+    def __init__(self, heap: MinHeap = None):
+        """
+        Wraps the passed heap, or a new empty MinHeap.  The heap must not be
+        used directly once it is wrapped.
+        """
+        self._heap = MinHeap() if heap is None else heap
+        self._waiters = collections.deque()
+
+    def __str__(self) -> str:
+        """
+        Return content of the wrapped heap in human-readable form
+        """
+        return str(self._heap)
+
+    def put(self, node: object, priority: object = None) -> object:
+        """
+        Adds a node and wakes one waiting get().  Returns whatever the heap's
+        add() returns (a HeapHandle in addressable mode).
+        """
+        handle = self._heap.add(node, priority)
+        self._wake_one()
+        return handle
+
+    def put_many(self, iterable) -> object:
+        """
+        Adds every value of an iterable and wakes one waiting get() per value.
+        """
+        start = self._heap.size()
+        handles = self._heap.push_many(iterable)
+        for _ in range(self._heap.size() - start):
+            self._wake_one()
+        return handles
+
+    async def get(self) -> object:
+        """
+        Removes and returns the minimum, waiting until a node is added if the
+        heap is empty.
+        """
+        while self._heap.is_empty():
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                # Pass a wake-up that arrived together with the cancellation
+                # on to the next waiter
+                if waiter.done() and not waiter.cancelled():
+                    self._wake_one()
+                raise
+        return self._heap.remove_min()
+
+    def get_nowait(self) -> object:
+        """
+        Removes and returns the minimum without waiting.
+        If the heap is empty, the method raises a MinHeapException.
+        """
+        return self._heap.remove_min()
+
+    def get_min(self) -> object:
+        """
+        Returns the minimum without removing it.
+        If the heap is empty, the method raises a MinHeapException.
+        """
+        return self._heap.get_min()
+
+    def is_empty(self) -> bool:
+        """
+        Returns true if the heap is empty, otherwise will return False
+        """
+        return self._heap.is_empty()
+
+    def size(self) -> int:
+        """
+        Returns the number of items currently stored in the heap.
+        """
+        return self._heap.size()
+
+    def _wake_one(self) -> None:
+        """
+        Wakes the longest waiting get() that has not been cancelled.
+        """
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
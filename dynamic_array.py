@@ -1,7 +1,23 @@
+import array
+import collections
+import copyreg
+import pickle
+import struct
+import sys
 
 from static_array import StaticArray
 
 
+# Bounds of the signed 64-bit integers stored with typecode 'q'
+_INT64_MIN = -(1 << 63)
+_INT64_MAX = (1 << 63) - 1
+
+# Header of to_bytes(): magic, typecode (b'O' for pickled objects), number
+# of elements and payload length, all little-endian
+_BYTES_HEADER = struct.Struct('<4scxxxQQ')
+_BYTES_MAGIC = b'DYNA'
+
+
 class DynamicArrayException(Exception):
     """
     Custom exception class to be used by Dynamic Array
@@ -11,6 +27,22 @@ class DynamicArrayException(Exception):
 
 
 class DynamicArray:
+    __slots__ = ('_size', '_capacity', '_data', '_index', '_growth_factor', '_shrink_divisor', '_reserved')
+
+    def __new__(cls, *args, **kwargs):
+        """
+        Creates the array with the default growth and shrink policy (set
+        through set_growth_policy): the capacity is multiplied by
+        _growth_factor when full, and cut to _growth_factor times the size when
+        the size drops below 1 / _shrink_divisor of the capacity, but never below
+        the capacity requested by reserve()
+        """
+        self = super().__new__(cls)
+        self._growth_factor = 2
+        self._shrink_divisor = 4
+        self._reserved = 0
+        return self
+
     def __init__(self, start_array=None):
         """
         Initialize new dynamic array
@@ -136,22 +168,22 @@ class DynamicArray:
         # Set the capacity to the new value.
         self._capacity = new_capacity
         # Create new array object that is the length of the new capacity.
-        self._new_array = StaticArray(new_capacity)
+        new_array = StaticArray(new_capacity)
         # Copy original array to new array
         if self._size > 0:
             for index in range(self._size):
-                self._new_array.set(index, self._data.get(index))
+                new_array.set(index, self._data.get(index))
         # Set new array to data variable
-        self._data = self._new_array
+        self._data = new_array
 
     def append(self, value: object) -> None:
         """
         This method will add a new value to the end of an Array.  If the storage associated with this
-        dynamic array is full, the capacity must be doubled using the resize() method.
+        dynamic array is full, the capacity must be grown (doubled by default) using the resize() method.
         """
         # First determine whether storage is full.
         if self._size == self._capacity:
-            self.resize(self._capacity * 2)
+            self.resize(self._grown_capacity())
         # set value to last index (which would be the size)
         self._data.set(self._size, value)
         # Increment size
@@ -165,9 +197,9 @@ class DynamicArray:
         """
         # Verify that the index passed is valid.
         if 0 <= index <= self._size:
-            # Determine whether we need to double the capacity based on the size.
+            # Determine whether we need to grow the capacity based on the size.
             if self._size == self._capacity:
-                self.resize(self._capacity * 2)
+                self.resize(self._grown_capacity())
             # Move each value up
             for inc in range(self._size - index):
                 self._data.set(self._size - inc, self._data.get(self._size - (inc + 1)))
@@ -189,12 +221,13 @@ class DynamicArray:
         if 0 <= index <= self._size - 1:
             # If the capacity is greater than 10
             # and the reduced capacity is greater than 10
-            # and the size is less than a quarter of the capacity
-            if self._capacity > 10 and self._size < (self._capacity / 4):
-                if self._size * 2 < 10:
-                    self.resize(10)
-                else:
-                    self.resize(self._size*2)
+            # and the size is less than a quarter (by default) of the capacity
+            # and the capacity is above the reserved capacity
+            if self._capacity > max(10, self._reserved) and self._size < (self._capacity / self._shrink_divisor):
+                # Leave one growth step of room: the size is then well above
+                # the next shrink threshold (the shrink divisor is larger than
+                # the growth factor), so removals do not resize again
+                self.resize(max(10, int(self._size * self._growth_factor), self._reserved))
             # move each value down
             for dec in range(self._size - index - 1):
                 self._data.set(index + dec, self._data.get(index+1+dec))
@@ -223,16 +256,208 @@ class DynamicArray:
 
         return new_array
 
+    def view(self, start_index: int, size: int) -> "DynamicArrayView":
+        """
+        Returns a window of the requested number of elements starting at the
+        starting index that shares this array's storage instead of copying
+        it.  Invalid bounds raise a DynamicArrayException, as in slice().
+        """
+        if not (self._size >= size >= 0 and 0 <= start_index and start_index + size <= self._size):
+            raise DynamicArrayException
+        return DynamicArrayView(self, start_index, size)
+
+    def as_memoryview(self, typecode: str) -> memoryview:
+        """
+        Packs the elements into an array.array of the given typecode (for
+        example 'q' or 'd') and returns a memoryview of it that can be passed
+        to file I/O or numpy.frombuffer.  The storage holds Python objects, so
+        this takes one packing pass, straight into the array without an
+        intermediate list; the view itself is not copied again.  A typecode
+        that cannot hold the elements raises a DynamicArrayException.
+        """
+        load = self._data.get
+        try:
+            packed = array.array(typecode, (load(index) for index in range(self._size)))
+        except (TypeError, ValueError, OverflowError):
+            raise DynamicArrayException
+        return memoryview(packed)
+
     def merge(self, second_da: "DynamicArray") -> None:
         """
         Takes a DynamicArray and appends all values within the object onto the current DynamicArray.
         """
-        # If the current storage is at capacity or will be upon addition of the elements then increase the capacity.
-        if self._capacity < self._size + second_da._size:
-            self.resize(self._capacity*2)
-        # Append each value to the end of the current DynamicArray
-        for index in range(second_da._size):
-            self.append(second_da._data.get(index))
+        # Copy all values in after a single resize
+        self.extend(second_da)
+
+    def extend(self, iterable) -> None:
+        """
+        Appends every value of an iterable.  The capacity is grown once to fit
+        all values before they are copied in.
+        """
+        # Values of another DynamicArray are read straight from its storage
+        if isinstance(iterable, DynamicArray):
+            source = iterable._data
+            count = iterable._size
+        else:
+            # Only known sequences are read by index; anything else (mappings,
+            # sets, generators) is iterated
+            if isinstance(iterable, (list, tuple, range, array.array, DynamicArrayView)):
+                source = iterable
+            else:
+                source = list(iterable)
+            count = len(source)
+        if count == 0:
+            return
+
+        # Grow once, by the growth factor as many times as needed
+        needed = self._size + count
+        if needed > self._capacity:
+            capacity = self._capacity
+            while capacity < needed:
+                capacity = self._grown_capacity(capacity)
+            self.resize(capacity)
+
+        store = self._data.set
+        start = self._size
+        if isinstance(source, list):
+            for index, value in enumerate(source):
+                store(start + index, value)
+        else:
+            load = source.get if isinstance(iterable, DynamicArray) else source.__getitem__
+            for index in range(count):
+                store(start + index, load(index))
+        self._size = needed
+
+    def reserve(self, capacity: int) -> None:
+        """
+        Grows the capacity to at least the passed number of elements and keeps
+        remove_at_index() from shrinking it below that until shrink_to_fit()
+        is called.
+        """
+        if capacity > self._capacity:
+            self.resize(capacity)
+        self._reserved = capacity
+
+    def shrink_to_fit(self) -> None:
+        """
+        Reduces the capacity to the number of stored elements (at least 1) and
+        drops any reserved capacity.
+        """
+        self._reserved = 0
+        self.resize(max(self._size, 1))
+
+    def set_growth_policy(self, growth_factor: float = 2, shrink_divisor: float = 4) -> None:
+        """
+        Sets the factor the capacity grows by when the array is full, and the
+        fraction (1 / shrink_divisor) of the capacity the size must drop below
+        before remove_at_index() shrinks the storage.  A shrink divisor larger
+        than the growth factor leaves a gap between the two thresholds, so
+        an array that oscillates around one size does not repeatedly resize.
+        Invalid values raise a DynamicArrayException.
+        """
+        if growth_factor <= 1 or shrink_divisor <= growth_factor:
+            raise DynamicArrayException
+        self._growth_factor = growth_factor
+        self._shrink_divisor = shrink_divisor
+
+    def _grown_capacity(self, capacity: int = None) -> int:
+        """
+        Returns the capacity after one growth step from the passed (or
+        current) capacity.
+        """
+        if capacity is None:
+            capacity = self._capacity
+        return max(capacity + 1, int(capacity * self._growth_factor))
+
+    def __getstate__(self) -> tuple:
+        """
+        Returns the stored elements (without the unused capacity), the
+        capacity and the resize policy.  Iterator state is not kept.
+        """
+        load = self._data.get
+        return ([load(index) for index in range(self._size)], self._capacity,
+                self._growth_factor, self._shrink_divisor, self._reserved)
+
+    def __setstate__(self, state: tuple) -> None:
+        """
+        Restores the array from __getstate__ in one pass over the elements.
+        """
+        values, self._capacity, self._growth_factor, self._shrink_divisor, self._reserved = state
+        self._data = StaticArray(self._capacity)
+        store = self._data.set
+        for index, value in enumerate(values):
+            store(index, value)
+        self._size = len(values)
+
+    def __reduce__(self) -> tuple:
+        return copyreg.__newobj__, (type(self),), self.__getstate__()
+
+    def to_bytes(self, typecode: str = None) -> bytes:
+        """
+        Serializes the elements as a header followed by one contiguous block.
+        Elements of an array typecode (by default 'q' if they are all ints
+        that fit in 64 bits, or 'd' if they are all floats) are written as
+        packed little-endian values; anything else is pickled.  A typecode
+        that cannot hold the elements raises a DynamicArrayException.
+        """
+        load = self._data.get
+        values = [load(index) for index in range(self._size)]
+        if typecode is None:
+            typecode = _typecode_of(values)
+        if typecode is None:
+            typecode = 'O'
+            payload = pickle.dumps(values, pickle.HIGHEST_PROTOCOL)
+        else:
+            try:
+                packed = array.array(typecode, values)
+            except (TypeError, ValueError, OverflowError):
+                raise DynamicArrayException
+            if sys.byteorder == 'big':
+                packed.byteswap()
+            payload = packed.tobytes()
+        return _BYTES_HEADER.pack(_BYTES_MAGIC, typecode.encode('ascii'), self._size, len(payload)) + payload
+
+    @classmethod
+    def from_bytes(cls, data) -> "DynamicArray":
+        """
+        Returns a new array from the output of to_bytes().  Packed values are
+        copied in after a single resize.  Malformed data raises a
+        DynamicArrayException.  Pickled payloads must come from a trusted
+        source.
+        """
+        da, end = cls._from_buffer(memoryview(data), 0)
+        if end != len(data):
+            raise DynamicArrayException
+        return da
+
+    @classmethod
+    def _from_buffer(cls, buffer: memoryview, offset: int) -> tuple:
+        """
+        Reads one serialized array starting at offset and returns it with the
+        offset just past it.
+        """
+        if offset + _BYTES_HEADER.size > len(buffer):
+            raise DynamicArrayException
+        magic, typecode, count, length = _BYTES_HEADER.unpack_from(buffer, offset)
+        start = offset + _BYTES_HEADER.size
+        end = start + length
+        if magic != _BYTES_MAGIC or end > len(buffer):
+            raise DynamicArrayException
+        try:
+            if typecode == b'O':
+                values = pickle.loads(buffer[start:end])
+            else:
+                values = array.array(typecode.decode('ascii'))
+                values.frombytes(buffer[start:end])
+                if sys.byteorder == 'big':
+                    values.byteswap()
+        except (ValueError, TypeError, pickle.UnpicklingError):
+            raise DynamicArrayException
+        if len(values) != count:
+            raise DynamicArrayException
+        da = cls()
+        da.extend(values)
+        return da, end
 
     def map(self, map_func) -> "DynamicArray":
         """
@@ -297,6 +522,98 @@ class DynamicArray:
         return result
 
 
+class DynamicArrayView:
+    """
+    Window of a DynamicArray (see DynamicArray.view).  Reads and writes go to
+    the underlying array, so the view stays valid across its resizes, but an
+    index beyond the array's current size raises a DynamicArrayException.
+    """
+
+    def __init__(self, base: DynamicArray, start_index: int, size: int):
+        self._base = base
+        self._start = start_index
+        self._size = size
+
+    def __str__(self) -> str:
+        """
+        Return content of the view in human-readable form
+        """
+        return 'DYN_ARR_VIEW Size: ' + str(self._size) + ' [' + ', '.join(str(value) for value in self) + ']'
+
+    def __iter__(self):
+        """
+        Iterates over the window.  Every iterator keeps its own position.
+        """
+        for index in range(self._size):
+            yield self.get_at_index(index)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def get_at_index(self, index: int) -> object:
+        """
+        Return value from given index position of the window
+        Invalid index raises DynamicArrayException
+        """
+        if index < 0 or index >= self._size:
+            raise DynamicArrayException
+        return self._base.get_at_index(self._start + index)
+
+    def set_at_index(self, index: int, value: object) -> None:
+        """
+        Store value at given index position of the window
+        Invalid index raises DynamicArrayException
+        """
+        if index < 0 or index >= self._size:
+            raise DynamicArrayException
+        self._base.set_at_index(self._start + index, value)
+
+    def __getitem__(self, index) -> object:
+        return self.get_at_index(index)
+
+    def __setitem__(self, index, value) -> None:
+        self.set_at_index(index, value)
+
+    def is_empty(self) -> bool:
+        """
+        Return True if the window is empty / False otherwise
+        """
+        return self._size == 0
+
+    def length(self) -> int:
+        """
+        Return number of elements in the window
+        """
+        return self._size
+
+    def view(self, start_index: int, size: int) -> "DynamicArrayView":
+        """
+        Returns a window of this window that shares the same storage.
+        """
+        if not (self._size >= size >= 0 and 0 <= start_index and start_index + size <= self._size):
+            raise DynamicArrayException
+        return DynamicArrayView(self._base, self._start + start_index, size)
+
+    def copy(self) -> DynamicArray:
+        """
+        Returns the elements of the window in a new DynamicArray.
+        """
+        new_array = DynamicArray()
+        new_array.extend(self)
+        return new_array
+
+
+def _typecode_of(values: list) -> str:
+    """
+    Returns the array typecode that can hold every value exactly, or None.
+    """
+    if all(type(value) is int and _INT64_MIN <= value <= _INT64_MAX for value in values):
+        return 'q'
+    if all(type(value) is float for value in values):
+        return 'd'
+    return None
+
+
 def find_mode(arr: DynamicArray) -> (DynamicArray, int):
     """
     Receives a dynamic array in either descending or ascending order and return a tuple which contains
@@ -346,3 +663,19 @@ def find_mode(arr: DynamicArray) -> (DynamicArray, int):
                     return arr, 1
                 return new_array.slice(mode_index, mode_counter), max_count + 1
             matches = 0
+
+
+def find_mode_unsorted(values) -> (DynamicArray, int):
+    """
+    Same result as find_mode, but for a DynamicArray or any other iterable in
+    any order: the values are counted in a single pass with a hash table
+    instead of being sorted first.  The modes are returned in the order they
+    first occur.  An empty input returns an empty array and a frequency of 0.
+    """
+    counts = collections.Counter(values)
+    modes = DynamicArray()
+    if not counts:
+        return modes, 0
+    frequency = max(counts.values())
+    modes.extend([value for value, count in counts.items() if count == frequency])
+    return modes, frequency
@@ -0,0 +1,237 @@
+import os
+import shutil
+import struct
+import sys
+import tempfile
+
+from min_heap import *
+
+
+# Largest number of bytes read or written per I/O call
+_BUFFER_SIZE = 1 << 20
+
+# While the runs are generated, each of the two I/O buffers gets one eighth
+# of the memory limit and one more eighth is left for the objects around the
+# heap's entries (files, array storage headers, the run list)
+_RUN_BUFFER_SHARE = 8
+
+
+class _RunEntry:
+    """
+    Record waiting in the replacement-selection heap, ordered by the run it
+    belongs to and then by the record itself.
+    """
+    __slots__ = ('run', 'record')
+
+    def __init__(self, run: int, record: tuple):
+        self.run = run
+        self.record = record
+
+    def __lt__(self, other: "_RunEntry") -> bool:
+        return self.run < other.run or (self.run == other.run and self.record < other.record)
+
+    def follows(self, record: tuple) -> bool:
+        """
+        Returns True if record can still be written after this entry's record
+        in the same run.
+        """
+        return not record < self.record
+
+
+class _ReversedRunEntry(_RunEntry):
+    """
+    Same as _RunEntry for runs written in non ascending order.
+    """
+    __slots__ = ()
+
+    def __lt__(self, other: "_ReversedRunEntry") -> bool:
+        return self.run < other.run or (self.run == other.run and other.record < self.record)
+
+    def follows(self, record: tuple) -> bool:
+        return not self.record < record
+
+
+class _RecordWriter:
+    """
+    Buffered writer of packed records, holding up to buffer_size bytes.
+    """
+
+    def __init__(self, path: str, record: struct.Struct, buffer_size: int):
+        # The records are collected in self._buffer, so the file is not
+        # buffered again
+        self._file = open(path, 'wb', buffering=0)
+        self._record = record
+        self._buffer_size = buffer_size
+        self._buffer = bytearray()
+
+    def write(self, values: tuple) -> None:
+        self._buffer += self._record.pack(*values)
+        if len(self._buffer) >= self._buffer_size:
+            self._flush()
+            self._buffer = bytearray()
+
+    def close(self) -> None:
+        self._flush()
+        self._file.close()
+
+    def _flush(self) -> None:
+        # An unbuffered write may store only part of the bytes passed
+        view = memoryview(self._buffer)
+        while view:
+            view = view[self._file.write(view):]
+
+
+def external_heapsort(input_path: str, output_path: str, memory_limit: int = 64 << 20,
+                      record_format: str = '<d', ascending: bool = False, fan_in: int = 64) -> None:
+    """
+    Sorts a file of fixed-width binary records (packed with record_format and
+    ordered like tuples) that may be larger than memory.  Runs are generated
+    by replacement selection with a MinHeap sized so that its entries and the
+    read and write buffers fit in memory_limit bytes, which gives runs of
+    about twice the heap's size on random input.  The runs are then merged
+    fan_in at a time with a heap-based k-way merge until one remains; the
+    fan_in read buffers and the write buffer of a merge share memory_limit.
+    The output is in non ascending order (like heapsort) unless ascending is
+    True.
+    """
+    record = struct.Struct(record_format)
+    if os.path.getsize(input_path) % record.size != 0 or fan_in < 2:
+        raise MinHeapException
+
+    work_dir = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(output_path)))
+    try:
+        entry_class = _RunEntry if ascending else _ReversedRunEntry
+        buffer_size = _buffer_size(memory_limit // _RUN_BUFFER_SHARE, record)
+        heap_memory = memory_limit - 2 * buffer_size - memory_limit // _RUN_BUFFER_SHARE
+        capacity = max(1, heap_memory // _entry_footprint(entry_class, record))
+        runs = _make_runs(input_path, work_dir, record, capacity, entry_class, buffer_size)
+        # fan_in read buffers and a write buffer, plus a share for the rest
+        buffer_size = _buffer_size(memory_limit // (fan_in + 2), record)
+        generation = 0
+        while len(runs) > 1:
+            merged = []
+            for start in range(0, len(runs), fan_in):
+                group = runs[start:start + fan_in]
+                if len(group) == 1:
+                    merged.append(group[0])
+                    continue
+                path = os.path.join(work_dir, 'merge-%d-%d' % (generation, start))
+                _merge_runs(group, path, record, not ascending, buffer_size)
+                for run_path in group:
+                    os.remove(run_path)
+                merged.append(path)
+            runs = merged
+            generation += 1
+
+        if runs:
+            os.replace(runs[0], output_path)
+        else:
+            open(output_path, 'wb').close()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def _buffer_size(memory: int, record: struct.Struct) -> int:
+    """
+    Returns the size of an I/O buffer that fits in memory bytes: a whole
+    number of records, at least one and at most _BUFFER_SIZE bytes.
+    """
+    return max(1, min(memory, _BUFFER_SIZE) // record.size) * record.size
+
+
+def _entry_footprint(entry_class, record: struct.Struct) -> int:
+    """
+    Returns the bytes taken by one heap entry: the entry, its record tuple,
+    the values in the tuple and the heap's array slot.  The record is
+    unpacked from 0x7f bytes, which gives integers close to the largest the
+    format can hold, so the estimate is not below a real record's.
+    """
+    values = record.unpack(b'\x7f' * record.size)
+    entry = entry_class(0, values)
+    return (sys.getsizeof(entry) + sys.getsizeof(values) + struct.calcsize('P')
+            + sum(sys.getsizeof(value) for value in values))
+
+
+def _read_records(path: str, record: struct.Struct, buffer_size: int):
+    """
+    Yields the records of a file, reading it into a single buffer of
+    buffer_size bytes.
+    """
+    buffer = bytearray(buffer_size)
+    # readinto() fills the buffer past the file's own, which only needs to
+    # hold one record (a buffer size of 1 would mean line buffering)
+    with open(path, 'rb', buffering=max(2, record.size)) as file:
+        while True:
+            length = file.readinto(buffer)
+            if not length:
+                return
+            yield from record.iter_unpack(memoryview(buffer)[:length])
+
+
+def _make_runs(input_path: str, work_dir: str, record: struct.Struct, capacity: int, entry_class,
+               buffer_size: int) -> list:
+    """
+    Replacement selection: the heap always writes its smallest entry of the
+    current run, and each record read in its place joins the current run if
+    it can still follow the record just written, or the next run otherwise.
+    The heap's array is reserved for capacity entries up front, so it never
+    holds the extra room of a growth.  Returns the paths of the run files in
+    order.
+    """
+    da = DynamicArray()
+    da.reserve(capacity)
+    heap = MinHeap()
+    heap.build_heap(da, copy=False)
+    runs = []
+    writer = None
+    current_run = -1
+
+    for values in _read_records(input_path, record, buffer_size):
+        if heap.size() < capacity:
+            heap.add(entry_class(0, values))
+            continue
+        entry = heap.get_min()
+        if entry.run != current_run:
+            writer = _start_run(writer, runs, work_dir, record, buffer_size)
+            current_run = entry.run
+        writer.write(entry.record)
+        # Reuse the written entry for the incoming record
+        if not entry.follows(values):
+            entry.run += 1
+        entry.record = values
+        heap.replace(entry)
+
+    # Drain the heap, which may hold the tail of two runs
+    while not heap.is_empty():
+        entry = heap.remove_min()
+        if entry.run != current_run:
+            writer = _start_run(writer, runs, work_dir, record, buffer_size)
+            current_run = entry.run
+        writer.write(entry.record)
+    if writer is not None:
+        writer.close()
+    return runs
+
+
+def _start_run(writer: _RecordWriter, runs: list, work_dir: str, record: struct.Struct,
+               buffer_size: int) -> _RecordWriter:
+    """
+    Closes the current run file (if any) and opens the next one.
+    """
+    if writer is not None:
+        writer.close()
+    path = os.path.join(work_dir, 'run-%d' % len(runs))
+    runs.append(path)
+    return _RecordWriter(path, record, buffer_size)
+
+
+def _merge_runs(paths: list, output_path: str, record: struct.Struct, reverse: bool, buffer_size: int) -> None:
+    """
+    Merges sorted run files into one with merge_sorted, with a read buffer
+    per run and a write buffer of buffer_size bytes each.
+    """
+    writer = _RecordWriter(output_path, record, buffer_size)
+    readers = [_read_records(path, record, buffer_size) for path in paths]
+    for values in merge_sorted(*readers, reverse=reverse):
+        writer.write(values)
+    writer.close()
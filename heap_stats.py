@@ -0,0 +1,287 @@
+import struct
+import time
+
+from min_heap import *
+
+
+# Bytes copied per element when a DynamicArray resizes (one reference)
+_POINTER_SIZE = struct.calcsize('P')
+
+# MinHeap and DynamicArray methods that are timed when stats are enabled
+_HEAP_OPERATIONS = ('add', 'remove_min', 'get_min', 'build_heap', 'push_many', 'pop_many', 'merge',
+                    'pushpop', 'replace', 'decrease_key', 'increase_key', 'update', 'remove', 'cancel',
+                    'discard', 'clear')
+_ARRAY_OPERATIONS = ('append', 'insert_at_index', 'remove_at_index', 'slice', 'merge', 'extend', 'reserve',
+                     'shrink_to_fit')
+
+# Array attributes of a MinHeap whose element accesses are counted
+_HEAP_ARRAYS = ('_heap', '_keys', '_seqs', '_handles')
+
+
+class OperationStats:
+    """
+    Counters for one kind of operation: number of calls, total latency, the
+    comparisons made by its sifts, the levels its sifts moved the hole
+    through and a latency histogram with power-of-two nanosecond buckets.
+    """
+    __slots__ = ('count', 'total_ns', 'comparisons', 'moves', 'histogram')
+
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self.comparisons = 0
+        self.moves = 0
+        self.histogram = [0] * 64
+
+    def as_dict(self) -> dict:
+        """
+        Returns the counters as plain data, keeping only non-empty buckets
+        (bucket k holds latencies below 2**k ns).
+        """
+        return {
+            'count': self.count,
+            'total_ns': self.total_ns,
+            'mean_ns': self.total_ns / self.count if self.count else 0,
+            'mean_comparisons': self.comparisons / self.count if self.count else 0,
+            'mean_moves': self.moves / self.count if self.count else 0,
+            'histogram': {bucket: hits for bucket, hits in enumerate(self.histogram) if hits},
+        }
+
+
+class HeapStats:
+    """
+    Statistics collected for an instrumented MinHeap or DynamicArray.
+    reads and writes count element accesses through get_at_index and
+    set_at_index, summed over all of a heap's parallel arrays.  For heaps,
+    comparisons counts the comparisons between entries made by the sifts
+    (a tie broken by insertion order is one comparison) and moves the levels
+    the sifts moved the hole through in the node array.  resizes and
+    bytes_copied describe DynamicArray reallocations.  If a callback is
+    passed, it is called as callback(name, elapsed_ns, stats) after every
+    timed operation.
+    """
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self._array_classes = {}
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Sets every counter back to zero.
+        """
+        self.reads = 0
+        self.writes = 0
+        self.comparisons = 0
+        self.moves = 0
+        self.resizes = 0
+        self.bytes_copied = 0
+        self.operations = {}
+
+    def record(self, name: str, elapsed_ns: int, comparisons: int, moves: int) -> None:
+        """
+        Adds one call of the named operation.
+        """
+        operation = self.operations.get(name)
+        if operation is None:
+            operation = self.operations[name] = OperationStats()
+        operation.count += 1
+        operation.total_ns += elapsed_ns
+        operation.comparisons += comparisons
+        operation.moves += moves
+        operation.histogram[min(elapsed_ns.bit_length(), 63)] += 1
+        if self.callback is not None:
+            self.callback(name, elapsed_ns, self)
+
+    def as_dict(self) -> dict:
+        """
+        Returns all statistics as plain data, ready for export.
+        """
+        return {
+            'reads': self.reads,
+            'writes': self.writes,
+            'comparisons': self.comparisons,
+            'moves': self.moves,
+            'resizes': self.resizes,
+            'bytes_copied': self.bytes_copied,
+            'operations': {name: operation.as_dict() for name, operation in self.operations.items()},
+        }
+
+
+def enable_stats(obj, callback=None) -> HeapStats:
+    """
+    Starts collecting statistics for a MinHeap (including its arrays) or a
+    DynamicArray and returns the HeapStats object they are collected in.
+    The object's class is swapped for an instrumented subclass, so objects
+    without stats run the original methods with no added checks.  An
+    instrumented heap sifts with its entry sifts, which count comparisons
+    and make the same moves as the sifts they stand in for.  If stats
+    are already enabled, the existing HeapStats is returned.
+    """
+    stats = get_stats(obj)
+    if stats is not None:
+        return stats
+    stats = HeapStats(callback)
+    if isinstance(obj, MinHeap):
+        methods = _heap_methods(type(obj), stats)
+        obj.__class__ = _instrumented_class(type(obj), stats, _HEAP_OPERATIONS, methods)
+        _instrument_arrays(obj, stats)
+    elif isinstance(obj, DynamicArray):
+        _instrument_array(obj, stats)
+    else:
+        raise TypeError('stats can only be enabled for MinHeap and DynamicArray objects')
+    return stats
+
+
+def get_stats(obj) -> HeapStats:
+    """
+    Returns the HeapStats of an instrumented object, or None.
+    """
+    return getattr(type(obj), '_stats', None)
+
+
+def disable_stats(obj) -> None:
+    """
+    Stops collecting statistics and restores the original class of the
+    object (and of a heap's arrays).
+    """
+    original = getattr(type(obj), '_original_class', None)
+    if original is None:
+        return
+    obj.__class__ = original
+    if isinstance(obj, MinHeap):
+        for name in _HEAP_ARRAYS:
+            array = getattr(obj, name)
+            if array is not None:
+                disable_stats(array)
+
+
+def _instrumented_class(base: type, stats: HeapStats, operations: tuple, methods: dict) -> type:
+    """
+    Returns a subclass of base with the same memory layout whose listed
+    operations are timed and whose methods are replaced by those passed.
+    """
+    namespace = {'__slots__': (), '_stats': stats, '_original_class': base,
+                 '__reduce__': _reduce_as(base)}
+    namespace.update(methods)
+    for name in operations:
+        if name not in namespace and hasattr(base, name):
+            namespace[name] = _timed(name, getattr(base, name), stats)
+    return type('Instrumented' + base.__name__, (base,), namespace)
+
+
+def _reduce_as(base: type):
+    """
+    Returns a __reduce__ that pickles an instrumented object as an object of
+    its original class, without its stats.
+    """
+    def __reduce__(self):
+        return _restore, (base, self.__getstate__())
+    return __reduce__
+
+
+def _restore(cls: type, state: tuple) -> object:
+    """
+    Unpickles an object saved by an instrumented class's __reduce__.
+    """
+    obj = cls.__new__(cls)
+    obj.__setstate__(state)
+    return obj
+
+
+def _timed(name: str, method, stats: HeapStats):
+    """
+    Wraps a method so each call records its latency and the comparisons and
+    moves of its sifts.  Heap operations also instrument arrays the call
+    created (clear and build_heap replace them).
+    """
+    def timed(self, *args, **kwargs):
+        comparisons = stats.comparisons
+        moves = stats.moves
+        start = time.perf_counter_ns()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            elapsed = time.perf_counter_ns() - start
+            if isinstance(self, MinHeap):
+                _instrument_arrays(self, stats)
+            stats.record(name, elapsed, stats.comparisons - comparisons, stats.moves - moves)
+    timed.__name__ = name
+    timed.__doc__ = method.__doc__
+    return timed
+
+
+def _heap_methods(base: type, stats: HeapStats) -> dict:
+    """
+    Counting versions of the MinHeap sift routines.  Every heap sifts with
+    the entry sifts, which compare through the counting _precedes, so plain
+    heaps make the same comparisons and moves as their percolate functions.
+    """
+    def _sift_up(self, index):
+        stats.moves += self._sift_entry_up(index)
+
+    def _sift_down(self, index):
+        # Only plain heaps use the bottom-up sift
+        bottom_up = self._bottom_up and self._keys is None and self._handles is None
+        stats.moves += self._sift_entry_down(index, bottom_up)
+
+    def _rebuild(self):
+        parent = (self._heap.length() - 2) // self._arity
+        while parent >= 0:
+            stats.moves += self._sift_entry_down(parent)
+            parent -= 1
+
+    def _precedes(self, key, seq, other_key, other_seq):
+        stats.comparisons += 1
+        return base._precedes(self, key, seq, other_key, other_seq)
+
+    return {'_sift_up': _sift_up, '_sift_down': _sift_down, '_rebuild': _rebuild, '_precedes': _precedes}
+
+
+def _array_methods(base: type, stats: HeapStats) -> dict:
+    """
+    Counting versions of the DynamicArray element accessors and resize().
+    """
+    def get_at_index(self, index):
+        stats.reads += 1
+        return base.get_at_index(self, index)
+
+    def set_at_index(self, index, value):
+        stats.writes += 1
+        base.set_at_index(self, index, value)
+
+    def resize(self, new_capacity):
+        capacity = self._capacity
+        base.resize(self, new_capacity)
+        if self._capacity != capacity:
+            stats.resizes += 1
+            stats.bytes_copied += self._size * _POINTER_SIZE
+
+    return {'get_at_index': get_at_index, 'set_at_index': set_at_index, 'resize': resize}
+
+
+def _instrument_array(array: DynamicArray, stats: HeapStats) -> None:
+    """
+    Swaps the class of a DynamicArray for a counting subclass.
+    """
+    if get_stats(array) is stats:
+        return
+    if get_stats(array) is not None:
+        disable_stats(array)
+    base = type(array)
+    # Arrays of the same class share one instrumented class per HeapStats
+    instrumented = stats._array_classes.get(base)
+    if instrumented is None:
+        instrumented = _instrumented_class(base, stats, _ARRAY_OPERATIONS, _array_methods(base, stats))
+        stats._array_classes[base] = instrumented
+    array.__class__ = instrumented
+
+
+def _instrument_arrays(heap: MinHeap, stats: HeapStats) -> None:
+    """
+    Instruments every array the heap currently stores its entries in.
+    """
+    for name in _HEAP_ARRAYS:
+        array = getattr(heap, name)
+        if array is not None:
+            _instrument_array(array, stats)
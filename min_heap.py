@@ -1,6 +1,22 @@
+import collections
+import copyreg
+import itertools
+import operator
+import struct
+from concurrent.futures import ProcessPoolExecutor
+
 from dynamic_array import *
 
 
+# Header of MinHeap.to_bytes(): magic, arity, flags, compact fraction and
+# insertion counter, followed by the serialized arrays
+_HEAP_HEADER = struct.Struct('<4sIBxxxdQ')
+_HEAP_MAGIC = b'MNHP'
+_BOTTOM_UP = 1
+_KEYED = 2
+_ADDRESSABLE = 4
+
+
 class MinHeapException(Exception):
     """
     Custom exception to be used by MinHeap class
@@ -9,7 +25,47 @@ class MinHeapException(Exception):
     pass
 
 
+class HeapHandle:
+    """
+    Handle to a node stored in an addressable MinHeap.  The heap keeps the
+    position of the node in the handle up to date as the node moves.
+    A cancelled handle marks its node as a tombstone until it is purged.
+    """
+    __slots__ = ('_index', '_cancelled')
+
+    def __init__(self, index: int):
+        self._index = index
+        self._cancelled = False
+
+
 class MinHeap:
+    __slots__ = ('_heap', '_arity', '_bottom_up', '_handles', '_key', '_keys', '_seqs', '_counter',
+                 '_dead', '_compact_fraction')
+
+    def __new__(cls, *args, **kwargs):
+        """
+        Creates the heap with the default options, which from_iterable
+        overrides
+        """
+        self = super().__new__(cls)
+        # Number of children per node and whether remove_min uses the
+        # bottom-up sift
+        self._arity = 2
+        self._bottom_up = False
+        # DynamicArray of HeapHandles parallel to _heap in addressable mode
+        self._handles = None
+        # In keyed mode nodes are ordered by the keys in _keys instead of by
+        # themselves; _seqs holds insertion numbers that break ties in FIFO order
+        self._key = None
+        self._keys = None
+        self._seqs = None
+        self._counter = 0
+        # Number of cancelled nodes still stored, and the fraction of the
+        # stored nodes they may reach before the heap is compacted
+        self._dead = 0
+        self._compact_fraction = 0.5
+        return self
+
     def __init__(self, start_heap=None):
         """
         Initialize a new MinHeap
@@ -31,46 +87,52 @@ class MinHeap:
         heap_data = [self._heap[i] for i in range(self._heap.length())]
         return 'HEAP ' + str(heap_data)
 
-    def add(self, node: object) -> None:
+    def __contains__(self, node: object) -> bool:
+        """
+        Returns True if the passed handle refers to a node still stored in the
+        heap (O(1)), or, for any other object, if an equal node is stored in
+        the heap (O(n)).
+        """
+        if isinstance(node, HeapHandle):
+            return self._is_valid(node)
+        return self._find(node) >= 0
+
+    def add(self, node: object, priority: object = None) -> object:
         """
         Adds a new object to the heap while maintaining heap property.
+        If a priority is passed, the node is ordered by it instead of by
+        itself, and the heap switches to keyed mode.  In addressable mode,
+        returns a HeapHandle for the new node.
         """
-        # First check to see if heap is empty
-        if self.is_empty():
+        if priority is not None and self._keys is None:
+            self._make_keyed()
+        if self._keys is not None:
+            self._append_key(node, priority)
+
+        handle = None
+        if self._handles is not None:
+            handle = HeapHandle(self._heap.length())
+            self._handles.append(handle)
+
+        # First check to see if heap is empty (cancelled nodes count here,
+        # since the new node must still be ordered against them)
+        if self._heap.is_empty():
             self._heap.append(node)
 
         # heap is not empty
         else:
             # First add new element to the last index (length - 1)
             self._heap.append(node)
+            # Percolate the new element up to its place
+            self._sift_up(self._heap.length() - 1)
 
-            child_index = self._heap.length() - 1  # Initialize child's value to last index variable
-            parent_index = (child_index - 1) // 2  # Initialize parent's index to child's index
-
-            # Percolate up the array until the parent is less than the value
-            # Initialize values
-            parent_val = self._heap.get_at_index(parent_index)
-            child_val = self._heap.get_at_index(child_index)
-
-            # While the child is less than parent and the parent_index is not negative
-            while child_val < parent_val and parent_index >= 0 and child_index > 0:
-                # Swap child with parent
-                self._heap.set_at_index(parent_index, child_val)
-                self._heap.set_at_index(child_index, parent_val)
-                # Reset values
-                child_index = parent_index  # Set child index to parent index
-                child_val = self._heap.get_at_index(child_index)
-                # If the child is at less than index 1, then there will be no
-                # next parent as the current parent is at the root of the heap
-                if child_index >= 1:
-                    parent_index = (child_index - 1) // 2
-                    parent_val = self._heap.get_at_index(parent_index)
+        return handle
 
     def is_empty(self) -> bool:
         """
         Returns true if the heap is empty, otherwise will return False
         """
-        return self._heap.is_empty()
+        return self.size() == 0
 
     def get_min(self) -> object:
         """
@@ -81,6 +143,7 @@ class MinHeap:
         if self.is_empty():
             raise MinHeapException  # Raise exception
         else:
+            self._purge_root()
             return self._heap.get_at_index(0)
 
     def remove_min(self) -> object:
@@ -91,176 +154,1092 @@ class MinHeap:
         if self.is_empty():
             raise MinHeapException  # Raise exception
         else:  # Heap is not empty
-            # Save minimum
-            minimum = self.get_min()
-            # Replace first index with the last value
-            self._heap.set_at_index(0, self._heap.get_at_index(self.size()-1))
-            # Remove last value
-            self._heap.remove_at_index(self.size() - 1)
-            # Percolate down the heap if array is greater than 1
-            if self.size() > 1:
-                _percolate_down(self._heap, 0)
-
-            return minimum
+            self._purge_root()
+            return self._remove_at(0)
 
-    def build_heap(self, da: DynamicArray) -> None:
+    def build_heap(self, da: DynamicArray, copy: bool = True) -> None:
         """
         Receives a dynamic array object with values in any order and builds
-        a proper MinHeap from them
+        a proper MinHeap from them.  If copy is False, the passed array is
+        heapified in place and becomes the heap's storage (even if it is
+        empty), so it must not be used by the caller afterwards; only a
+        DynamicArray can be adopted, anything else raises a MinHeapException.
         """
+        if not copy and not isinstance(da, DynamicArray):
+            raise MinHeapException
+        self._reset()
+        if not copy:
+            self._heap = da
+
         # Check to see if array is empty.
         if da.is_empty():
-            self._heap = DynamicArray()
             return
 
         else:  # Array is not empty
-            self._heap = DynamicArray(da)
-            # Find the largest index in array
-            largest_index = da.length()-1
-            # Find the parent of the value at the largest index
-            parent = (largest_index-1) // 2
-            # iterate until root is reached
-            while parent >= 0:
-                _percolate_down(self._heap, parent)
-                # Move parent to previous index
-                parent -= 1
+            if copy:
+                # Copy the values in after a single resize
+                self._heap.extend(da)
+            self._append_entries(0)
+            self._rebuild()
 
     def size(self) -> int:
         """
-        Returns the number of items currently stored in the heap.
+        Returns the number of items currently stored in the heap, not
+        counting cancelled ones.
         """
-        return self._heap.length()
+        return self._heap.length() - self._dead
 
     def clear(self) -> None:
         """
-        Clears the contents of the heap.
+        Clears the contents of the heap.  The new storage starts at the current
+        capacity, so refilling the heap does not grow it again from scratch,
+        but it shrinks as usual if the heap stays small.
         """
-        # Set heap to empty DynamicArray
-        self._heap = DynamicArray()
+        self._reset(self._heap.get_capacity())
 
+    @classmethod
+    def from_iterable(cls, iterable=None, bottom_up: bool = False, arity: int = 2,
+                      addressable: bool = False, key=None, compact_fraction: float = 0.5) -> "MinHeap":
+        """
+        Builds a new MinHeap from any iterable in linear time.  All values are
+        appended first and then heapified bottom-up, instead of calling add()
+        once per value.  If bottom_up is True, remove_min uses the bottom-up
+        sift, which needs fewer comparisons.  arity sets the number of children
+        per node (2, 4 and 8 are typical); wider heaps are shallower, making
+        add() cheaper.  If addressable is True, add() returns a HeapHandle
+        that can be passed to decrease_key, increase_key, update and remove.
+        If a key function is passed, nodes are ordered by key(node), which is
+        computed once and stored apart from the node; equal keys are removed
+        in insertion order.  Keyed heaps move a key and an insertion number
+        with every node, so they are slower than storing (key, order, node)
+        tuples in a plain heap.  Cancelled nodes are purged in one linear pass
+        once they exceed compact_fraction of the stored nodes.  An arity below
+        2 or a compact_fraction outside (0, 1] raises a MinHeapException.
+        """
+        if arity < 2 or not 0 < compact_fraction <= 1:
+            raise MinHeapException
+        heap = cls()
+        heap._bottom_up = bottom_up
+        heap._arity = arity
+        heap._compact_fraction = compact_fraction
+        if addressable:
+            heap._handles = DynamicArray()
+        if key is not None:
+            heap._key = key
+            heap._make_keyed()
+        if iterable is not None:
+            heap.push_many(iterable)
+        return heap
+
+    def push_many(self, iterable) -> object:
+        """
+        Adds every value of an iterable to the heap.  Values are appended first;
+        if the batch is large compared with the heap the whole array is
+        re-heapified, otherwise only the appended values are percolated up.
+        In keyed mode the nodes are ordered by the key function (or by
+        themselves).  In addressable mode, returns a DynamicArray with the
+        handles of the new nodes in the order they were passed.
+        """
+        start = self._heap.length()
+        # Copy the values in after a single resize
+        self._heap.extend(iterable)
+        new_handles = self._append_entries(start)
+        self._restore_tail(start)
+        return new_handles
 
-def heapsort(da: DynamicArray) -> None:
+    def merge(self, other: "MinHeap") -> None:
+        """
+        Moves every node of another heap into this one and leaves the other
+        heap empty.  The other heap's arrays are appended in one block each,
+        then the whole heap is re-heapified in linear time, or only the
+        appended nodes are percolated up if they are few compared with this
+        heap.  Handles of the other heap stay valid and now refer to this
+        heap.  Mixing key spaces is not supported: merging a heap into itself,
+        or a keyed heap whose key function differs from this heap's, raises a
+        MinHeapException.
+        """
+        start = self._heap.length()
+        self._absorb(other)
+        self._restore_tail(start)
+
+    @classmethod
+    def union(cls, *heaps) -> "MinHeap":
+        """
+        Returns a new heap with the nodes of all passed heaps, which are left
+        empty.  The new heap has the options of the first heap; it is keyed
+        or addressable if any of the heaps is.  All arrays are concatenated
+        first and heapified once in linear time.  Passing the same heap twice,
+        or a keyed heap whose key function differs from the first heap's,
+        raises a MinHeapException before any heap is changed.
+        """
+        heap = cls()
+        if heaps:
+            heap._arity = heaps[0]._arity
+            heap._bottom_up = heaps[0]._bottom_up
+            heap._key = heaps[0]._key
+            heap._compact_fraction = heaps[0]._compact_fraction
+        seen = set()
+        for other in heaps:
+            if id(other) in seen or not heap._can_absorb(other):
+                raise MinHeapException
+            seen.add(id(other))
+        for other in heaps:
+            heap._absorb(other)
+        heap._restore_tail(0)
+        return heap
+
+    def pop_many(self, k: int) -> DynamicArray:
+        """
+        Removes up to k minimum values from the heap and returns them in a
+        DynamicArray in ascending order.  If k is negative, the method raises
+        a MinHeapException.
+        """
+        if k < 0:
+            raise MinHeapException
+        result = DynamicArray()
+        # Stop early if the heap runs out of values
+        for _ in range(min(k, self.size())):
+            result.append(self.remove_min())
+        return result
+
+    def pushpop(self, node: object, priority: object = None) -> object:
+        """
+        Adds a node and then removes and returns the minimum, using a single
+        percolation instead of an add() followed by a remove_min().  If the
+        new node would be the minimum it is returned without touching the heap.
+        In addressable mode the new node would get no handle, so the method
+        raises a MinHeapException; use add() and remove_min() instead.
+        """
+        if self._handles is not None:
+            raise MinHeapException
+        if self.is_empty():
+            return node
+        if self._keys is None and priority is None:
+            if not self._heap.get_at_index(0) < node:
+                return node
+        else:
+            if self._keys is None:
+                self._make_keyed()
+            if priority is None:
+                priority = node if self._key is None else self._key(node)
+            # An equal key was added later, so the stored node leaves first
+            if priority < self._keys.get_at_index(0):
+                return node
+        return self._replace_root(node, priority)
+
+    def replace(self, node: object, priority: object = None) -> object:
+        """
+        Removes and returns the minimum and then adds a node, using a single
+        percolation instead of a remove_min() followed by an add().
+        If the heap is empty or addressable (the new node would get no
+        handle), the method raises a MinHeapException.
+        """
+        if self.is_empty() or self._handles is not None:
+            raise MinHeapException
+        if priority is not None and self._keys is None:
+            self._make_keyed()
+        return self._replace_root(node, priority)
+
+    def decrease_key(self, handle: HeapHandle, key: object) -> None:
+        """
+        Lowers the key of the node referenced by handle and moves it up to its
+        new place.  In plain mode the key is the node itself, so the node is
+        replaced; in keyed mode the priority is replaced.  An invalid handle or
+        a greater key raises a MinHeapException.
+        """
+        index = self._index_of(handle)
+        if self._get_key(index) < key:
+            raise MinHeapException
+        self._set_key(index, key)
+        self._sift_up(index)
+
+    def increase_key(self, handle: HeapHandle, key: object) -> None:
+        """
+        Raises the key of the node referenced by handle and moves it down to
+        its new place.  An invalid handle or a smaller key raises a
+        MinHeapException.
+        """
+        index = self._index_of(handle)
+        if key < self._get_key(index):
+            raise MinHeapException
+        self._set_key(index, key)
+        self._sift_down(index)
+
+    def update(self, handle: HeapHandle, key: object) -> None:
+        """
+        Replaces the key of the node referenced by handle with any key and
+        restores the heap property.  An invalid handle raises a
+        MinHeapException.
+        """
+        index = self._index_of(handle)
+        self._set_key(index, key)
+        self._sift_up(index)
+        # The node did not move up, so it may need to move down
+        if handle._index == index:
+            self._sift_down(index)
+
+    def remove(self, handle: HeapHandle) -> object:
+        """
+        Removes the node referenced by handle from the heap and returns it.
+        An invalid handle raises a MinHeapException.
+        """
+        return self._remove_at(self._index_of(handle))
+
+    def cancel(self, handle: HeapHandle) -> None:
+        """
+        Marks the node referenced by handle as cancelled in O(1).  The node
+        stays stored as a tombstone, is skipped by get_min and remove_min and
+        no longer counts towards size().  An invalid or already cancelled
+        handle raises a MinHeapException.
+        """
+        self._index_of(handle)
+        handle._cancelled = True
+        self._dead += 1
+        if self._dead > self._compact_fraction * self._heap.length():
+            self._compact()
+
+    def discard(self, item: object) -> bool:
+        """
+        Removes one node equal to item from the heap.  Returns True if a node
+        was removed, or False if no such node is stored.  Finding the node
+        takes O(n); use cancel() with a handle to remove a node in O(1).
+        """
+        index = self._find(item)
+        if index < 0:
+            return False
+        self._remove_at(index)
+        return True
+
+    def __getstate__(self) -> tuple:
+        """
+        Returns the heap's arrays and options.  The arrays keep heap order,
+        so restoring needs no re-heapify.
+        """
+        return tuple(getattr(self, name) for name in MinHeap.__slots__)
+
+    def __setstate__(self, state: tuple) -> None:
+        for name, value in zip(MinHeap.__slots__, state):
+            setattr(self, name, value)
+
+    def __reduce__(self) -> tuple:
+        return copyreg.__newobj__, (type(self),), self.__getstate__()
+
+    def to_bytes(self, typecode: str = None) -> bytes:
+        """
+        Serializes the heap in heap order as a header followed by its arrays
+        in DynamicArray.to_bytes() format, so numeric nodes, keys and
+        insertion numbers are written as packed blocks.  typecode applies to
+        the nodes.  In addressable mode only the cancelled flags are written,
+        since handles cannot be serialized (see from_bytes).  The key function
+        is not written either.
+        """
+        flags = (_BOTTOM_UP if self._bottom_up else 0) | (_KEYED if self._keys is not None else 0) \
+            | (_ADDRESSABLE if self._handles is not None else 0)
+        parts = [_HEAP_HEADER.pack(_HEAP_MAGIC, self._arity, flags, self._compact_fraction, self._counter),
+                 self._heap.to_bytes(typecode)]
+        if self._keys is not None:
+            parts.append(self._keys.to_bytes())
+            parts.append(self._seqs.to_bytes('q'))
+        if self._handles is not None:
+            cancelled = DynamicArray()
+            cancelled.extend([int(self._handles.get_at_index(index)._cancelled)
+                              for index in range(self._handles.length())])
+            parts.append(cancelled.to_bytes('b'))
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, data, key=None) -> "MinHeap":
+        """
+        Returns a new heap from the output of to_bytes() without re-heapifying.
+        A keyed heap orders nodes added later by the passed key function (or
+        by themselves).  An addressable heap is restored as a non-addressable
+        one, since no caller could get handles to its nodes: cancelled nodes
+        are dropped and the rest re-heapified.  Malformed data raises a
+        MinHeapException.
+        """
+        buffer = memoryview(data)
+        if len(buffer) < _HEAP_HEADER.size:
+            raise MinHeapException
+        magic, arity, flags, compact_fraction, counter = _HEAP_HEADER.unpack_from(buffer, 0)
+        if magic != _HEAP_MAGIC or arity < 2 or not 0 < compact_fraction <= 1:
+            raise MinHeapException
+
+        heap = cls()
+        heap._arity = arity
+        heap._bottom_up = bool(flags & _BOTTOM_UP)
+        heap._compact_fraction = compact_fraction
+        try:
+            heap._heap, offset = DynamicArray._from_buffer(buffer, _HEAP_HEADER.size)
+            length = heap._heap.length()
+            if flags & _KEYED:
+                heap._key = key
+                heap._keys, offset = DynamicArray._from_buffer(buffer, offset)
+                heap._seqs, offset = DynamicArray._from_buffer(buffer, offset)
+                heap._counter = counter
+                if heap._keys.length() != length or heap._seqs.length() != length:
+                    raise MinHeapException
+            if flags & _ADDRESSABLE:
+                cancelled, offset = DynamicArray._from_buffer(buffer, offset)
+                if cancelled.length() != length:
+                    raise MinHeapException
+                live = [index for index in range(length) if not cancelled.get_at_index(index)]
+                if len(live) < length:
+                    heap._drop_all_but(live)
+        except DynamicArrayException:
+            raise MinHeapException
+        if offset != len(buffer):
+            raise MinHeapException
+        return heap
+
+    # -----------------------------------------------------------------------
+
+    def _is_valid(self, handle: HeapHandle) -> bool:
+        """
+        Returns True if the handle refers to a node stored in this heap.
+        """
+        index = handle._index
+        return self._handles is not None and 0 <= index < self._handles.length() \
+            and self._handles.get_at_index(index) is handle and not handle._cancelled
+
+    def _is_dead(self, index: int) -> bool:
+        """
+        Returns True if the node at the passed index has been cancelled.
+        """
+        return self._dead > 0 and self._handles.get_at_index(index)._cancelled
+
+    def _find(self, node: object) -> int:
+        """
+        Returns the index of a live node equal to the passed one, or -1.
+        """
+        for index in range(self._heap.length()):
+            if self._heap.get_at_index(index) == node and not self._is_dead(index):
+                return index
+        return -1
+
+    def _purge_root(self) -> None:
+        """
+        Removes cancelled nodes from the root until a live node is there.
+        """
+        while self._is_dead(0):
+            self._remove_at(0)
+
+    def _compact(self) -> None:
+        """
+        Drops every cancelled node and rebuilds the heap in linear time.
+        """
+        handles = self._handles
+        live = [index for index in range(self._heap.length())
+                if not handles.get_at_index(index)._cancelled]
+        self._dead = 0
+        self._drop_all_but(live)
+
+    def _drop_all_but(self, live: list) -> None:
+        """
+        Keeps only the nodes at the passed indices, with their keys,
+        insertion numbers and handles, and rebuilds the heap in linear time.
+        """
+        for name in ('_heap', '_keys', '_seqs', '_handles'):
+            old = getattr(self, name)
+            if old is not None:
+                new = DynamicArray()
+                new.extend([old.get_at_index(index) for index in live])
+                setattr(self, name, new)
+        if self._handles is not None:
+            for index in range(self._handles.length()):
+                self._handles.get_at_index(index)._index = index
+        self._rebuild()
+
+    def _index_of(self, handle: HeapHandle) -> int:
+        """
+        Returns the current index of the node referenced by handle.
+        An invalid handle raises a MinHeapException.
+        """
+        if not isinstance(handle, HeapHandle) or not self._is_valid(handle):
+            raise MinHeapException
+        return handle._index
+
+    def _make_keyed(self) -> None:
+        """
+        Switches the heap to keyed mode.  Stored nodes become their own keys
+        and get insertion numbers in index order; since parents always have
+        smaller indices than their children the heap property still holds.
+        """
+        self._keys = DynamicArray()
+        self._keys.extend(self._heap)
+        self._seqs = DynamicArray()
+        self._seqs.extend(range(self._heap.length()))
+        self._counter = self._heap.length()
+
+    def _make_addressable(self) -> None:
+        """
+        Switches the heap to addressable mode, with new handles for the
+        stored nodes.
+        """
+        self._handles = DynamicArray()
+        self._handles.extend([HeapHandle(index) for index in range(self._heap.length())])
+
+    def _absorb(self, other: "MinHeap") -> None:
+        """
+        Appends the nodes of another heap with their keys, insertion numbers
+        (offset to follow this heap's) and handles, switching this heap to
+        keyed or addressable mode if the other heap is, and empties the other
+        heap.  The heap property is not restored.
+        """
+        if not self._can_absorb(other):
+            raise MinHeapException
+        if other._keys is not None and self._keys is None:
+            self._make_keyed()
+        if other._handles is not None and self._handles is None:
+            self._make_addressable()
+
+        start = self._heap.length()
+        count = other._heap.length()
+        self._heap.extend(other._heap)
+        if other._keys is None:
+            # Plain nodes get keys and insertion numbers as if just added;
+            # only the handles are taken over below
+            handles = self._handles
+            if other._handles is not None:
+                self._handles = None
+            self._append_entries(start)
+            self._handles = handles
+        else:
+            self._keys.extend(other._keys)
+            other_seqs = other._seqs.get_at_index
+            self._seqs.extend([self._counter + other_seqs(index) for index in range(count)])
+            self._counter += other._counter
+            if self._handles is not None and other._handles is None:
+                self._handles.extend([HeapHandle(index) for index in range(start, start + count)])
+        if other._handles is not None and self._handles is not None:
+            self._handles.extend(other._handles)
+            for index in range(start, start + count):
+                self._handles.get_at_index(index)._index = index
+            self._dead += other._dead
+        other._reset()
+
+    def _can_absorb(self, other: "MinHeap") -> bool:
+        """
+        Returns True if the nodes of another heap can be moved into this one:
+        it is a different heap, and unless it is plain, its keys were made
+        with the same key function as this heap's.
+        """
+        return other is not self and (other._keys is None or other._key == self._key)
+
+    def _restore_tail(self, start: int) -> None:
+        """
+        Restores the heap property after nodes were appended from index start
+        on.  A bottom-up rebuild costs O(n) while sifting the k appended
+        nodes costs O(k log n), so the heap is rebuilt once they are at least
+        half of it.  Too many cancelled nodes are dropped by compacting instead.
+        """
+        length = self._heap.length()
+        if self._dead > self._compact_fraction * length:
+            self._compact()
+        elif (length - start) * 2 >= length:
+            self._rebuild()
+        else:
+            for index in range(start, length):
+                self._sift_up(index)
+
+    def _append_key(self, node: object, priority: object = None) -> None:
+        """
+        Appends the key and insertion number of a new node in keyed mode.
+        """
+        if priority is None:
+            priority = node if self._key is None else self._key(node)
+        self._keys.append(priority)
+        self._seqs.append(self._counter)
+        self._counter += 1
+
+    def _append_entries(self, start: int) -> object:
+        """
+        Appends keys and handles for the nodes stored from index start on.
+        Returns a DynamicArray of the new handles in addressable mode.
+        """
+        end = self._heap.length()
+        if self._keys is not None:
+            get = self._heap.get_at_index
+            if self._key is None:
+                self._keys.extend([get(index) for index in range(start, end)])
+            else:
+                self._keys.extend([self._key(get(index)) for index in range(start, end)])
+            self._seqs.extend(range(self._counter, self._counter + end - start))
+            self._counter += end - start
+        if self._handles is None:
+            return None
+        new_handles = DynamicArray()
+        new_handles.extend([HeapHandle(index) for index in range(start, end)])
+        self._handles.extend(new_handles)
+        return new_handles
+
+    def _reset(self, capacity: int = 0) -> None:
+        """
+        Replaces the storage (and the key and handle arrays in use) with empty
+        arrays with room for capacity entries.
+        """
+        self._heap = _empty_array(capacity)
+        if self._keys is not None:
+            self._keys = _empty_array(capacity)
+            self._seqs = _empty_array(capacity)
+            self._counter = 0
+        if self._handles is not None:
+            self._handles = _empty_array(capacity)
+        self._dead = 0
+
+    def _replace_root(self, node: object, priority: object = None) -> object:
+        """
+        Stores a node at the root in place of the minimum, percolates it down
+        and returns the old minimum.  Only used without handles.
+        """
+        minimum = self._heap.get_at_index(0)
+        if self._keys is None:
+            self._heap.set_at_index(0, node)
+        else:
+            if priority is None:
+                priority = node if self._key is None else self._key(node)
+            self._place(0, node, priority, self._counter, None)
+            self._counter += 1
+        self._sift_down(0)
+        return minimum
+
+    def _get_key(self, index: int) -> object:
+        """
+        Returns the key the node at the passed index is ordered by.
+        """
+        if self._keys is None:
+            return self._heap.get_at_index(index)
+        return self._keys.get_at_index(index)
+
+    def _set_key(self, index: int, key: object) -> None:
+        """
+        Replaces the key of the node at the passed index (the node itself in
+        plain mode).
+        """
+        if self._keys is None:
+            self._heap.set_at_index(index, key)
+        else:
+            self._keys.set_at_index(index, key)
+
+    def _remove_at(self, index: int) -> object:
+        """
+        Removes and returns the node at the passed index by moving the last
+        node into its place and restoring the heap property.
+        """
+        heap = self._heap
+        last = heap.length() - 1
+        node = heap.get_at_index(index)
+        if self._handles is not None:
+            handle = self._handles.get_at_index(index)
+            handle._index = -1
+            if handle._cancelled:
+                self._dead -= 1
+
+        # Replace the index with the last value and remove the last value
+        if index != last:
+            self._move(last, index)
+        heap.remove_at_index(last)
+        if self._keys is not None:
+            self._keys.remove_at_index(last)
+            self._seqs.remove_at_index(last)
+        if self._handles is not None:
+            self._handles.remove_at_index(last)
+
+        # Percolate the moved value if there is more than one value left
+        if index < last and heap.length() > 1:
+            if index > 0:
+                self._sift_up(index)
+            self._sift_down(index)
+        return node
+
+    def _rebuild(self) -> None:
+        """
+        Restores the heap property over the whole array in linear time.
+        """
+        if self._handles is None and self._keys is None:
+            _heapify(self._heap, self._arity)
+            return
+        # Find the parent of the value at the largest index
+        parent = (self._heap.length() - 2) // self._arity
+        while parent >= 0:
+            self._sift_down(parent)
+            parent -= 1
+
+    def _sift_up(self, index: int) -> None:
+        """
+        Percolates the node at the passed index up the heap.
+        """
+        if self._keys is None and self._handles is None:
+            _percolate_up(self._heap, index, self._arity)
+        else:
+            self._sift_entry_up(index)
+
+    def _sift_down(self, index: int) -> None:
+        """
+        Percolates the node at the passed index down the heap.
+        """
+        if self._keys is not None or self._handles is not None:
+            self._sift_entry_down(index)
+        elif self._bottom_up:
+            _percolate_down_bottom_up(self._heap, index, None, self._arity)
+        else:
+            _percolate_down(self._heap, index, None, self._arity)
+
+    def _move(self, src: int, dst: int) -> None:
+        """
+        Copies the node at index src, with its key, insertion number and
+        handle, to index dst.
+        """
+        self._heap.set_at_index(dst, self._heap.get_at_index(src))
+        if self._keys is not None:
+            self._keys.set_at_index(dst, self._keys.get_at_index(src))
+            self._seqs.set_at_index(dst, self._seqs.get_at_index(src))
+        if self._handles is not None:
+            handle = self._handles.get_at_index(src)
+            handle._index = dst
+            self._handles.set_at_index(dst, handle)
+
+    def _place(self, index: int, node: object, key: object, seq: int, handle: HeapHandle) -> None:
+        """
+        Stores a node with its key, insertion number and handle at index.
+        """
+        self._heap.set_at_index(index, node)
+        if self._keys is not None:
+            self._keys.set_at_index(index, key)
+            self._seqs.set_at_index(index, seq)
+        if handle is not None:
+            handle._index = index
+            self._handles.set_at_index(index, handle)
+
+    def _entry(self, index: int) -> tuple:
+        """
+        Returns the node at the passed index with its key, insertion number
+        and handle (None for the ones the heap does not store).
+        """
+        handle = None if self._handles is None else self._handles.get_at_index(index)
+        return self._heap.get_at_index(index), self._get_key(index), self._get_seq(index), handle
+
+    def _get_seq(self, index: int) -> int:
+        """
+        Returns the insertion number of the node at the passed index, or None
+        if the heap is not keyed.
+        """
+        return None if self._seqs is None else self._seqs.get_at_index(index)
+
+    def _precedes(self, key: object, seq: int, other_key: object, other_seq: int) -> bool:
+        """
+        Returns True if an entry goes before another: a smaller key, or an
+        equal key added earlier (insertion numbers are None if the heap is
+        not keyed).
+        """
+        if key < other_key:
+            return True
+        if seq is None or other_key < key:
+            return False
+        return seq < other_seq
+
+    def _sift_entry_up(self, child: int) -> int:
+        """
+        Same as _percolate_up for keyed or addressable heaps: compares entries
+        with _precedes and moves keys, insertion numbers and handles along
+        with the nodes.  Returns the number of levels the hole moved.
+        """
+        precedes = self._precedes
+        get_key = (self._heap if self._keys is None else self._keys).get_at_index
+        get_seq = self._get_seq if self._seqs is None else self._seqs.get_at_index
+        node, key, seq, handle = self._entry(child)
+        hole = child
+        levels = 0
+        while hole > 0:
+            parent = (hole - 1) // self._arity
+            if not precedes(key, seq, get_key(parent), get_seq(parent)):
+                break
+            # Move the parent down into the hole
+            self._move(parent, hole)
+            hole = parent
+            levels += 1
+        if hole != child:
+            self._place(hole, node, key, seq, handle)
+        return levels
+
+    def _sift_entry_down(self, parent: int, bottom_up: bool = False) -> int:
+        """
+        Same as _percolate_down (or _percolate_down_bottom_up if bottom_up is
+        True) for keyed or addressable heaps: compares entries with _precedes
+        and moves keys, insertion numbers and handles along with the nodes.
+        Returns the number of levels the hole moved.
+        """
+        precedes = self._precedes
+        get_key = (self._heap if self._keys is None else self._keys).get_at_index
+        get_seq = self._get_seq if self._seqs is None else self._seqs.get_at_index
+        arity = self._arity
+        end = self._heap.length()
+        node, key, seq, handle = self._entry(parent)
+        hole = parent
+        levels = 0
+        child = arity * hole + 1
+        while child < end:
+            # Pick the smallest of the children
+            child_key = get_key(child)
+            child_seq = get_seq(child)
+            for index in range(child + 1, min(child + arity, end)):
+                index_key = get_key(index)
+                index_seq = get_seq(index)
+                if precedes(index_key, index_seq, child_key, child_seq):
+                    child = index
+                    child_key = index_key
+                    child_seq = index_seq
+            if not bottom_up and not precedes(child_key, child_seq, key, seq):
+                break
+            # Move the child up into the hole
+            self._move(child, hole)
+            hole = child
+            levels += 1
+            child = arity * hole + 1
+        if bottom_up:
+            # Climb back up while the node goes before the parent of the hole
+            while hole > parent:
+                up = (hole - 1) // arity
+                if not precedes(key, seq, get_key(up), get_seq(up)):
+                    break
+                self._move(up, hole)
+                hole = up
+                levels += 1
+            self._place(hole, node, key, seq, handle)
+        elif hole != parent:
+            self._place(hole, node, key, seq, handle)
+        return levels
+
+
+class _SmallestEntry:
+    """
+    Node kept by nsmallest.  Entries compare in reverse, so the root of the
+    bounded MinHeap is the largest key, and the latest of equal keys.
+    """
+    __slots__ = ('key', 'order', 'node')
+
+    def __init__(self, key: object, order: int, node: object):
+        self.key = key
+        self.order = order
+        self.node = node
+
+    def __lt__(self, other: "_SmallestEntry") -> bool:
+        return other.key < self.key or (not self.key < other.key and other.order < self.order)
+
+    def beaten_by(self, key: object) -> bool:
+        return key < self.key
+
+
+class _LargestEntry(_SmallestEntry):
+    """
+    Node kept by nlargest.  The root of the bounded MinHeap is the smallest
+    key, and the latest of equal keys.
+    """
+    __slots__ = ()
+
+    def __lt__(self, other: "_LargestEntry") -> bool:
+        return self.key < other.key or (not other.key < self.key and other.order < self.order)
+
+    def beaten_by(self, key: object) -> bool:
+        return self.key < key
+
+
+def nsmallest(k: int, iterable, key=None) -> DynamicArray:
+    """
+    Returns a DynamicArray with the k smallest values of an iterable in
+    ascending order (equal values keep their original order).  The values are
+    streamed through a MinHeap that never holds more than k entries.
+    """
+    return _select(k, iterable, key, _SmallestEntry)
+
+
+def nlargest(k: int, iterable, key=None) -> DynamicArray:
+    """
+    Returns a DynamicArray with the k largest values of an iterable in
+    descending order (equal values keep their original order).  The values
+    are streamed through a MinHeap that never holds more than k entries.
+    """
+    return _select(k, iterable, key, _LargestEntry)
+
+
+def top_k_frequent(iterable, k: int, workers: int = None, chunk_size: int = 1 << 16) -> DynamicArray:
+    """
+    Returns a DynamicArray with (value, count) tuples for the k most frequent
+    values of an iterable, most frequent first (equal counts keep the order
+    the values first occur in).  The values are counted in one pass with a
+    hash table and the counts are streamed through a bounded MinHeap, so the
+    input never has to be sorted.  If workers is greater than 1, the input is
+    cut into chunks of chunk_size values that are counted in a process pool,
+    with only a few chunks in flight at a time, and the partial counts are
+    merged; the values must then be picklable.
+    """
+    if workers is None or workers <= 1:
+        counts = collections.Counter(iterable)
+    else:
+        counts = _count_in_pool(iterable, workers, chunk_size)
+    return nlargest(k, counts.items(), key=operator.itemgetter(1))
+
+
+def _count_in_pool(iterable, workers: int, chunk_size: int) -> collections.Counter:
+    """
+    Counts the values of an iterable chunk by chunk in a process pool.  The
+    partial counts are merged in chunk order, so the values keep the order
+    they first occur in.
+    """
+    counts = collections.Counter()
+    values = iter(iterable)
+    pending = collections.deque()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while True:
+            chunk = list(itertools.islice(values, chunk_size))
+            if not chunk:
+                break
+            pending.append(pool.submit(collections.Counter, chunk))
+            # Bound the number of chunks held in memory
+            if len(pending) >= 2 * workers:
+                counts.update(pending.popleft().result())
+        while pending:
+            counts.update(pending.popleft().result())
+    return counts
+
+
+def _select(k: int, iterable, key, entry_class) -> DynamicArray:
+    """
+    Keeps the k best values of an iterable in a bounded MinHeap whose root is
+    the worst value kept, replacing the root whenever a better value arrives.
+    """
+    result = DynamicArray()
+    if k <= 0:
+        return result
+
+    heap = MinHeap()
+    order = 0
+    for node in iterable:
+        node_key = node if key is None else key(node)
+        if heap.size() < k:
+            heap.add(entry_class(node_key, order, node))
+        else:
+            worst = heap.get_min()
+            # Later values only win with a strictly better key
+            if worst.beaten_by(node_key):
+                # Reuse the evicted entry instead of allocating a new one
+                worst.key = node_key
+                worst.order = order
+                worst.node = node
+                heap.replace(worst)
+        order += 1
+
+    # The heap removes the worst value first, so fill the result from the back
+    for _ in range(heap.size()):
+        result.append(None)
+    for index in range(result.length() - 1, -1, -1):
+        result.set_at_index(index, heap.remove_min().node)
+    return result
+
+
+class _MergeEntry:
+    """
+    Head of one input of merge_sorted.  Equal keys are ordered by the
+    position of their input, which keeps the merge stable.
+    """
+    __slots__ = ('key', 'order', 'node', 'advance')
+
+    def __init__(self, key: object, order: int, node: object, advance):
+        self.key = key
+        self.order = order
+        self.node = node
+        self.advance = advance
+
+    def __lt__(self, other: "_MergeEntry") -> bool:
+        return self.key < other.key or (not other.key < self.key and self.order < other.order)
+
+
+class _ReversedMergeEntry(_MergeEntry):
+    """
+    Head of one input of merge_sorted(reverse=True), ordered by descending key.
+    """
+    __slots__ = ()
+
+    def __lt__(self, other: "_ReversedMergeEntry") -> bool:
+        return other.key < self.key or (not self.key < other.key and self.order < other.order)
+
+
+def merge_sorted(*iterables, key=None, reverse: bool = False):
+    """
+    Lazily merges sorted iterables into a single sorted stream.  Only the
+    current head of each input is kept in a MinHeap, so memory is O(k) and
+    time O(n log k) for k inputs.  Equal keys are yielded in input order.
+    If reverse is True, the inputs must be sorted in descending order.
+    """
+    entry_class = _ReversedMergeEntry if reverse else _MergeEntry
+    heap = MinHeap()
+    order = 0
+    for iterable in iterables:
+        advance = iter(iterable).__next__
+        try:
+            node = advance()
+        except StopIteration:
+            order += 1
+            continue
+        heap.add(entry_class(node if key is None else key(node), order, node, advance))
+        order += 1
+
+    while not heap.is_empty():
+        entry = heap.get_min()
+        yield entry.node
+        try:
+            node = entry.advance()
+        except StopIteration:
+            heap.remove_min()
+            continue
+        # Advance the head in place and percolate it with a single sift
+        entry.key = node if key is None else key(node)
+        entry.node = node
+        heap.replace(entry)
+
+
+def heapsort(da: DynamicArray, bottom_up: bool = False, arity: int = 2) -> None:
     """
     Receives a DynamicArray and sorts its contents in non ascending order
-    using the HeapSort algorithm
+    using the HeapSort algorithm.  If bottom_up is True, the bottom-up sift
+    is used, which roughly halves the number of comparisons.  arity sets the
+    number of children per node of the intermediate heap; an arity below 2
+    raises a MinHeapException.
     """
-    # Build a heap out of the array.
+    if arity < 2:
+        raise MinHeapException
+
     # Check to see if array is empty.
     if da.is_empty():
         return
-    else:  # Array is not empty
-        # We first need to turn the Array into a min heap.
-        # Find the largest index in array
-        largest_index = da.length() - 1
-        # Find the parent of the value at the largest index
-        parent = (largest_index - 1) // 2
-        # iterate until root is reached
-        while parent >= 0:
-            _percolate_down(da, parent)
-            # Move parent to previous index
-            parent -= 1
 
-    # Now we may sort the array in non-ascending order
-    # Initialize counter to the last index
-    count_down = da.length()-1
-    count_up = 1
-    while count_down != 0:
-        back_val = da.get_at_index(count_down)
-        first_val = da.get_at_index(0)
-        da.set_at_index(count_down, first_val)
+    # We first need to turn the Array into a min heap.
+    _heapify(da, arity)
+
+    sift = _percolate_down_bottom_up if bottom_up else _percolate_down
+    # Now we may sort the array in non-ascending order by repeatedly moving
+    # the minimum behind the shrinking heap.  Initialize end to the last index.
+    end = da.length() - 1
+    while end > 0:
+        back_val = da.get_at_index(end)
+        da.set_at_index(end, da.get_at_index(0))
         da.set_at_index(0, back_val)
-        count_up += 1
-        if count_down != 1:
-            _percolate_down(da, 0, count_up)
-        count_down -= 1
-
-def _percolate_down(da: DynamicArray, parent: int, stop = 0) -> None:
-    """
-    Moves down a passed heap starting with the parent passed.
-    Preconditions: length of array is greater than 1
-    """
-
-    # Initialize variables
-    first_child_index = 2 * parent + 1
-    second_child_index = 2 * parent + 2
-    # Set parent value
-    parent_val = da.get_at_index(parent)
-    counter = 0
-    # Are either child's indices out of range?
-    if first_child_index >= da.length()-stop or second_child_index >= da.length():
-        if da.get_at_index(first_child_index):
-            if parent_val > da.get_at_index(first_child_index):
-                da.set_at_index(parent, da.get_at_index(first_child_index))
-                da.set_at_index(first_child_index, parent_val)
-
-        elif da.get_at_index(second_child_index):
-            if parent_val > da.get_at_index(second_child_index):
-                da.set_at_index(parent, da.get_at_index(second_child_index))
-                da.set_at_index(second_child_index, parent_val)
-
-    # Percolate down while the parent's index is 1 or greater (parent should not be less than or equal to 0)
-    while parent < da.length()-stop and first_child_index <= da.length()-stop-1 or second_child_index <= da.length()-stop-1 \
-            and counter != da.length() - stop:
-        # If first and second indices are less than the length of da - 1
-        if first_child_index < da.length() and second_child_index < da.length():
-            # If left child is less than or equal to second child
-            if da.get_at_index(first_child_index) <= da.get_at_index(second_child_index):
-                first_child_val = da.get_at_index(first_child_index)
-                # If parent is less than first child
-                if parent_val > first_child_val:
-                    # Set child to parent's index
-                    da.set_at_index(parent, first_child_val)
-                    # Set parent to child's index
-                    da.set_at_index(first_child_index, parent_val)
-                    # Set new indices
-                    parent = first_child_index
-                    first_child_index = 2 * parent + 1
-                    second_child_index = 2 * parent + 2
-                    counter+=1
-                else:
-                    break
-            # second child is less than first child
-            else:
-                if parent_val > da.get_at_index(second_child_index):
-                    # Set child to parent's index
-                    da.set_at_index(parent,  da.get_at_index(second_child_index))
-                    # Set parent to child's index
-                    da.set_at_index(second_child_index, parent_val)
-                    # Set new indices
-                    parent = second_child_index
-                    first_child_index = 2 * parent + 1
-                    second_child_index = 2 * parent + 2
-                    counter+=1
-                else:
-                    break
-        else:
-            # Either first child index or second child index is out of range
-            if first_child_index < da.length():
-                first_child_val = da.get_at_index(first_child_index)
-                if parent_val > first_child_val:
-                    # Set child to parent's index
-                    da.set_at_index(parent, first_child_val)
-                    # Set parent to child's index
-                    da.set_at_index(first_child_index, parent_val)
-                    # Set new indices
-                    parent = first_child_index
-                    first_child_index = 2 * parent + 1
-                    second_child_index = 2 * parent + 2
-                    counter +=1
-                else:
-                    break
-            elif second_child_index < da.length():
-                if parent_val > da.get_at_index(second_child_index):
-                    # Set child to parent's index
-                    da.set_at_index(parent,  da.get_at_index(second_child_index))
-                    # Set parent to child's index
-                    da.set_at_index(second_child_index, parent_val)
-                    # Set new indices
-                    parent = second_child_index
-                    first_child_index = 2 * parent + 1
-                    second_child_index = 2 * parent + 2
-                    counter += 1
-                else:
-                    break
-            else:
-                break
+        sift(da, 0, end, arity)
+        end -= 1
+
+
+def _empty_array(capacity: int = 0) -> DynamicArray:
+    """
+    Returns an empty DynamicArray with room for capacity values.  The room
+    is allocated with resize() rather than reserve(), so it is not kept once
+    removals would shrink the array.
+    """
+    da = DynamicArray()
+    if capacity > da.get_capacity():
+        da.resize(capacity)
+    return da
+
+
+def _heapify(da: DynamicArray, arity: int = 2) -> None:
+    """
+    Turns the passed array into a min heap in place using Floyd's bottom-up
+    method, percolating every parent down starting from the last one.
+    """
+    end = da.length()
+    # Find the parent of the value at the largest index
+    parent = (end - 2) // arity
+    # iterate until root is reached
+    while parent >= 0:
+        _percolate_down(da, parent, end, arity)
+        # Move parent to previous index
+        parent -= 1
+
+
+def _percolate_up(da: DynamicArray, child: int, arity: int = 2) -> None:
+    """
+    Moves the value at the passed index up the heap.  Larger parents are moved
+    down into the hole left behind, and the value is written once at its
+    final position.
+    """
+    get = da.get_at_index
+    set = da.set_at_index
+    child_val = get(child)
+    hole = child
+    while hole > 0:
+        parent = (hole - 1) // arity
+        parent_val = get(parent)
+        if not child_val < parent_val:
+            break
+        # Move the parent down into the hole
+        set(hole, parent_val)
+        hole = parent
+    if hole != child:
+        set(hole, child_val)
+
+
+def _percolate_down(da: DynamicArray, parent: int, end: int = None, arity: int = 2) -> None:
+    """
+    Moves the value at the passed index down the heap, which occupies indices
+    [0, end) of the array (the whole array by default).  Smaller children are
+    moved up into the hole, and the value is written once at its final
+    position.
+    """
+    get = da.get_at_index
+    set = da.set_at_index
+    if end is None:
+        end = da.length()
+    parent_val = get(parent)
+    hole = parent
+    child = arity * hole + 1
+    while child < end:
+        # Pick the smallest of the children
+        child_val = get(child)
+        for index in range(child + 1, min(child + arity, end)):
+            index_val = get(index)
+            if index_val < child_val:
+                child = index
+                child_val = index_val
+        if not child_val < parent_val:
+            break
+        # Move the child up into the hole
+        set(hole, child_val)
+        hole = child
+        child = arity * hole + 1
+    if hole != parent:
+        set(hole, parent_val)
+
+
+def _percolate_down_bottom_up(da: DynamicArray, parent: int, end: int = None, arity: int = 2) -> None:
+    """
+    Bottom-up (Wegener) variant of _percolate_down.  The hole is first moved
+    to a leaf along the path of smallest children without comparing against
+    the moving value, then the value climbs back up to its place.  Values
+    moved down from the bottom of the heap usually belong near a leaf, so this
+    needs about half the comparisons of the top-down sift.
+    """
+    get = da.get_at_index
+    set = da.set_at_index
+    if end is None:
+        end = da.length()
+    parent_val = get(parent)
+    hole = parent
+    child = arity * hole + 1
+    # Move the smallest child up at every level until a leaf is reached
+    while child < end:
+        child_val = get(child)
+        for index in range(child + 1, min(child + arity, end)):
+            index_val = get(index)
+            if index_val < child_val:
+                child = index
+                child_val = index_val
+        set(hole, child_val)
+        hole = child
+        child = arity * hole + 1
+    # Climb back up while the value is less than the parent of the hole
+    while hole > parent:
+        up = (hole - 1) // arity
+        up_val = get(up)
+        if not parent_val < up_val:
+            break
+        set(hole, up_val)
+        hole = up
+    set(hole, parent_val)
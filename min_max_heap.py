@@ -0,0 +1,261 @@
+from min_heap import *
+
+
+class MinMaxHeap:
+    """
+    Double-ended priority queue stored in a DynamicArray.  Nodes on even
+    levels (starting with the root) are no greater than their descendants
+    and nodes on odd levels are no smaller, so the minimum is at the root
+    and the maximum is one of its children.  If a capacity is passed, the
+    heap holds at most that many nodes and add() evicts the greatest one.
+    """
+
+    def __init__(self, start_heap=None, capacity: int = None):
+        """
+        Initialize a new MinMaxHeap.  A negative capacity raises a
+        MinHeapException.
+        """
+        if capacity is not None and capacity < 0:
+            raise MinHeapException
+        self._heap = DynamicArray()
+        self._capacity = capacity
+
+        # populate the heap with initial values (if provided)
+        if start_heap:
+            for node in start_heap:
+                self.add(node)
+
+    def __str__(self) -> str:
+        """
+        Return heap content in human-readable form
+        """
+        heap_data = [self._heap[i] for i in range(self._heap.length())]
+        return 'MINMAXHEAP ' + str(heap_data)
+
+    def add(self, node: object) -> object:
+        """
+        Adds a new object to the heap while maintaining the heap property.
+        If the heap is at capacity, the greatest of the stored nodes and the
+        new one is evicted and returned (the new node when it ties with the
+        maximum); otherwise returns None.
+        """
+        if self._capacity is not None and self._heap.length() >= self._capacity:
+            if self._heap.is_empty() or not node < self.get_max():
+                return node
+            return self._replace_max(node)
+
+        # Add the node at the end and percolate it up to its place
+        self._heap.append(node)
+        self._push_up(self._heap.length() - 1)
+        return None
+
+    def is_empty(self) -> bool:
+        """
+        Returns true if the heap is empty, otherwise will return False
+        """
+        return self._heap.is_empty()
+
+    def size(self) -> int:
+        """
+        Returns the number of items currently stored in the heap.
+        """
+        return self._heap.length()
+
+    def get_min(self) -> object:
+        """
+        Returns an object with the minimum key, without removing it from the heap.
+        If the heap is empty, the method raises a MinHeapException
+        """
+        if self.is_empty():
+            raise MinHeapException
+        return self._heap.get_at_index(0)
+
+    def get_max(self) -> object:
+        """
+        Returns an object with the maximum key, without removing it from the heap.
+        If the heap is empty, the method raises a MinHeapException
+        """
+        if self.is_empty():
+            raise MinHeapException
+        return self._heap.get_at_index(self._max_index())
+
+    def remove_min(self) -> object:
+        """
+        Returns an object with the minimum key, and removes it from the heap.
+        If the heap is empty, the method raises a MinHeapException
+        """
+        if self.is_empty():
+            raise MinHeapException
+        return self._remove_at(0)
+
+    def remove_max(self) -> object:
+        """
+        Returns an object with the maximum key, and removes it from the heap.
+        If the heap is empty, the method raises a MinHeapException
+        """
+        if self.is_empty():
+            raise MinHeapException
+        return self._remove_at(self._max_index())
+
+    def build_heap(self, da: DynamicArray) -> None:
+        """
+        Receives a dynamic array object with values in any order and builds
+        a proper MinMaxHeap from them in linear time.  If the heap has a
+        capacity, only the smallest values up to the capacity are kept.
+        """
+        self._heap = DynamicArray()
+        self._heap.extend(da)
+        # Push every parent down, starting with the parent of the last value
+        parent = (self._heap.length() - 2) // 2
+        while parent >= 0:
+            self._push_down(parent)
+            parent -= 1
+        if self._capacity is not None:
+            while self._heap.length() > self._capacity:
+                self.remove_max()
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the heap.
+        """
+        self._heap = DynamicArray()
+
+    # -----------------------------------------------------------------------
+
+    def _max_index(self) -> int:
+        """
+        Returns the index of the maximum: the root if it has no children,
+        otherwise the greater of its children.
+        """
+        length = self._heap.length()
+        if length < 3:
+            return length - 1
+        get = self._heap.get_at_index
+        return 2 if get(1) < get(2) else 1
+
+    def _remove_at(self, index: int) -> object:
+        """
+        Removes and returns the node at index 0 or at the max index by moving
+        the last node into its place and pushing it down.
+        """
+        heap = self._heap
+        node = heap.get_at_index(index)
+        last = heap.length() - 1
+        if index != last:
+            heap.set_at_index(index, heap.get_at_index(last))
+        heap.remove_at_index(last)
+        if index < last:
+            self._push_down(index)
+        return node
+
+    def _replace_max(self, node: object) -> object:
+        """
+        Stores a node smaller than the maximum in its place and returns the
+        old maximum.
+        """
+        heap = self._heap
+        index = self._max_index()
+        maximum = heap.get_at_index(index)
+        heap.set_at_index(index, node)
+        if index > 0:
+            # The new node may be smaller than the minimum at the root
+            root = heap.get_at_index(0)
+            if node < root:
+                heap.set_at_index(0, node)
+                heap.set_at_index(index, root)
+            self._push_down(index)
+        return maximum
+
+    def _push_up(self, child: int) -> None:
+        """
+        Percolates the node at the passed index up along the min levels or
+        the max levels of its ancestors, depending on how it compares with
+        its parent.
+        """
+        if child == 0:
+            return
+        get = self._heap.get_at_index
+        set = self._heap.set_at_index
+        parent = (child - 1) // 2
+        node = get(child)
+        parent_node = get(parent)
+        if _is_min_level(child):
+            if parent_node < node:
+                # Belongs to the max levels above the parent
+                set(child, parent_node)
+                self._push_up_level(parent, node, True)
+            else:
+                self._push_up_level(child, node, False)
+        else:
+            if node < parent_node:
+                # Belongs to the min levels above the parent
+                set(child, parent_node)
+                self._push_up_level(parent, node, False)
+            else:
+                self._push_up_level(child, node, True)
+
+    def _push_up_level(self, hole: int, node: object, is_max: bool) -> None:
+        """
+        Moves node up from the hole by grandparents, staying on min levels or
+        on max levels, and stores it at its place.
+        """
+        get = self._heap.get_at_index
+        set = self._heap.set_at_index
+        while hole > 2:
+            grandparent = (hole - 3) // 4
+            grandparent_node = get(grandparent)
+            if is_max:
+                if not grandparent_node < node:
+                    break
+            elif not node < grandparent_node:
+                break
+            set(hole, grandparent_node)
+            hole = grandparent
+        set(hole, node)
+
+    def _push_down(self, index: int) -> None:
+        """
+        Percolates the node at the passed index down by grandchildren,
+        swapping it with its parent when it passes a node of the other kind.
+        """
+        heap = self._heap
+        get = heap.get_at_index
+        set = heap.set_at_index
+        end = heap.length()
+        is_max = not _is_min_level(index)
+        node = get(index)
+        while True:
+            child = 2 * index + 1
+            if child >= end:
+                break
+            # Pick the extreme of the children and grandchildren
+            best = child
+            best_node = get(child)
+            for descendant in (child + 1, 4 * index + 3, 4 * index + 4, 4 * index + 5, 4 * index + 6):
+                if descendant >= end:
+                    break
+                descendant_node = get(descendant)
+                if (best_node < descendant_node) if is_max else (descendant_node < best_node):
+                    best, best_node = descendant, descendant_node
+            if not ((node < best_node) if is_max else (best_node < node)):
+                break
+            set(index, best_node)
+            if best <= child + 1:
+                # A child has no descendants on the same kind of level
+                index = best
+                break
+            index = best
+            # Swap with the parent if the node belongs on its kind of level
+            parent = (index - 1) // 2
+            parent_node = get(parent)
+            if (parent_node < node) if not is_max else (node < parent_node):
+                set(parent, node)
+                node = parent_node
+        set(index, node)
+
+
+def _is_min_level(index: int) -> bool:
+    """
+    Returns True if the node at the passed index is on a min (even) level.
+    """
+    return (index + 1).bit_length() % 2 == 1
@@ -0,0 +1,347 @@
+import mmap
+import os
+import shutil
+import struct
+
+from min_heap import MinHeapException
+
+
+# File header: magic, version, clean flag, record size, count, capacity,
+# generation, followed by the record format padded to _FORMAT_SIZE bytes.
+# The generation counts the flushes that made a dirty file clean.
+_MAGIC = b'MINHEAP1'
+_VERSION = 2
+_HEADER = struct.Struct('<8sHHIQQQ')
+_FORMAT_SIZE = 32
+_HEADER_SIZE = 72
+_COUNT_OFFSET = 16
+_CLEAN_OFFSET = 10
+_GENERATION_OFFSET = 32
+
+
+class MappedMinHeap:
+    """
+    Binary min heap of fixed-width records stored in a memory-mapped file.
+    Records are tuples packed with a struct format and are ordered like
+    tuples (by their first field, then the next, and so on).  add() and
+    remove_min() work directly on the mapped pages, so reopening a cleanly
+    flushed file only maps it, without re-heapifying.
+    """
+
+    def __init__(self, path: str, record_format: str, file, mm: mmap.mmap):
+        """
+        Initialize a heap over an already opened and mapped file.  Use
+        MappedMinHeap.open() instead of calling this directly.
+        """
+        self._path = path
+        self._record = struct.Struct(record_format)
+        self._file = file
+        self._mm = mm
+        magic, version, clean, record_size, count, capacity, generation = _HEADER.unpack_from(mm, 0)
+        self._count = count
+        self._capacity = capacity
+        self._clean = clean
+        self._generation = generation
+
+    @classmethod
+    def open(cls, path: str, record_format: str = '<dq', capacity: int = 1024) -> "MappedMinHeap":
+        """
+        Maps the heap file at path, creating it with room for capacity records
+        if it does not exist.  A file that was not flushed before the process
+        stopped is restored from its snapshot if the snapshot is at least as
+        new as the last flush, otherwise its records are re-heapified.  A file
+        with a different record format, or whose header does not match its
+        length, raises a MinHeapException.
+        """
+        record = struct.Struct(record_format)
+        if len(record_format) > _FORMAT_SIZE or capacity < 1:
+            raise MinHeapException
+        if not os.path.exists(path):
+            with open(path, 'wb') as file:
+                file.write(_pack_header(record_format, record.size, 0, capacity, True, 0))
+                file.truncate(_HEADER_SIZE + capacity * record.size)
+
+        if os.path.getsize(path) < _HEADER_SIZE:
+            raise MinHeapException
+        file = open(path, 'r+b')
+        mm = mmap.mmap(file.fileno(), 0)
+        magic, version, clean, record_size, count, stored_capacity, generation = _HEADER.unpack_from(mm, 0)
+        stored_format = bytes(mm[_HEADER.size:_HEADER.size + _FORMAT_SIZE]).rstrip(b'\0').decode('ascii', 'replace')
+        # A file cut short (for example by a crash while it was written) has
+        # fewer records than its header claims
+        if (magic != _MAGIC or version != _VERSION or stored_format != record_format
+                or count > stored_capacity or len(mm) < _HEADER_SIZE + stored_capacity * record.size):
+            mm.close()
+            file.close()
+            raise MinHeapException
+
+        heap = cls(path, record_format, file, mm)
+        if not clean:
+            heap._recover()
+        return heap
+
+    def __str__(self) -> str:
+        """
+        Return heap content in human-readable form
+        """
+        return 'HEAP ' + str([self._get(index) for index in range(self._count)])
+
+    def add(self, record: tuple) -> None:
+        """
+        Adds a record to the heap while maintaining heap property.
+        """
+        if self._count == self._capacity:
+            self._grow(self._capacity * 2)
+        self._mark_dirty()
+        self._count += 1
+        self._sift_up(self._count - 1, tuple(record))
+        self._store_count()
+
+    def is_empty(self) -> bool:
+        """
+        Returns true if the heap is empty, otherwise will return False
+        """
+        return self._count == 0
+
+    def get_min(self) -> tuple:
+        """
+        Returns the minimum record without removing it from the heap.
+        If the heap is empty, the method raises a MinHeapException
+        """
+        if self._count == 0:
+            raise MinHeapException
+        return self._get(0)
+
+    def remove_min(self) -> tuple:
+        """
+        Returns the minimum record, and removes it from the heap.
+        If the heap is empty, the method raises a MinHeapException
+        """
+        if self._count == 0:
+            raise MinHeapException
+        self._mark_dirty()
+        minimum = self._get(0)
+        self._count -= 1
+        if self._count > 0:
+            self._sift_down(0, self._get(self._count))
+        self._store_count()
+        return minimum
+
+    def size(self) -> int:
+        """
+        Returns the number of records currently stored in the heap.
+        """
+        return self._count
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the heap (the file keeps its capacity).
+        """
+        self._mark_dirty()
+        self._count = 0
+        self._store_count()
+
+    def flush(self) -> None:
+        """
+        Writes all changes to disk and marks the file as clean, so the next
+        open() maps it as is.  Flushing a dirty file moves it to the next
+        generation, which makes older snapshots stale.
+        """
+        if not self._clean:
+            self._generation += 1
+            struct.pack_into('<Q', self._mm, _GENERATION_OFFSET, self._generation)
+        self._mm.flush()
+        self._clean = 1
+        struct.pack_into('<H', self._mm, _CLEAN_OFFSET, 1)
+        self._mm.flush()
+
+    def snapshot(self, snapshot_path: str = None) -> str:
+        """
+        Flushes the heap and writes a crash-consistent copy of the file: the
+        copy is written to a temporary file, synced and then renamed over the
+        snapshot, so a crash leaves either the old or the new snapshot in
+        place.  The copy keeps the generation of the flush, so recovery can
+        tell whether a later flush made it stale.  Returns the snapshot path
+        (path + '.snapshot' by default).
+        """
+        if snapshot_path is None:
+            snapshot_path = self._path + '.snapshot'
+        self.flush()
+        used = _HEADER_SIZE + self._count * self._record.size
+        temp_path = snapshot_path + '.tmp'
+        with open(temp_path, 'wb') as file:
+            file.write(self._mm[:used])
+            # Keep the header capacity valid for the shorter file
+            file.seek(_COUNT_OFFSET + 8)
+            file.write(struct.pack('<Q', max(self._count, 1)))
+            file.truncate(_HEADER_SIZE + max(self._count, 1) * self._record.size)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, snapshot_path)
+        _fsync_directory(snapshot_path)
+        return snapshot_path
+
+    def close(self) -> None:
+        """
+        Flushes the heap and unmaps the file.
+        """
+        self.flush()
+        self._mm.close()
+        self._file.close()
+
+    # -----------------------------------------------------------------------
+
+    def _get(self, index: int) -> tuple:
+        """
+        Unpacks the record at the passed index from the mapped file.
+        """
+        return self._record.unpack_from(self._mm, _HEADER_SIZE + index * self._record.size)
+
+    def _set(self, index: int, record: tuple) -> None:
+        """
+        Packs a record into the passed index of the mapped file.
+        """
+        self._record.pack_into(self._mm, _HEADER_SIZE + index * self._record.size, *record)
+
+    def _copy(self, src: int, dst: int) -> None:
+        """
+        Copies the raw bytes of one record over another.
+        """
+        size = self._record.size
+        src = _HEADER_SIZE + src * size
+        dst = _HEADER_SIZE + dst * size
+        self._mm[dst:dst + size] = self._mm[src:src + size]
+
+    def _sift_up(self, hole: int, record: tuple) -> None:
+        """
+        Moves a hole from the passed index up the heap, shifting larger
+        parents down, and writes the record at its final place.
+        """
+        while hole > 0:
+            parent = (hole - 1) // 2
+            if not record < self._get(parent):
+                break
+            self._copy(parent, hole)
+            hole = parent
+        self._set(hole, record)
+
+    def _sift_down(self, hole: int, record: tuple) -> None:
+        """
+        Moves a hole from the passed index down the heap, shifting smaller
+        children up, and writes the record at its final place.
+        """
+        end = self._count
+        child = 2 * hole + 1
+        while child < end:
+            child_record = self._get(child)
+            if child + 1 < end:
+                right_record = self._get(child + 1)
+                if right_record < child_record:
+                    child += 1
+                    child_record = right_record
+            if not child_record < record:
+                break
+            self._copy(child, hole)
+            hole = child
+            child = 2 * hole + 1
+        self._set(hole, record)
+
+    def _store_count(self) -> None:
+        """
+        Writes the current record count into the header.
+        """
+        struct.pack_into('<Q', self._mm, _COUNT_OFFSET, self._count)
+
+    def _mark_dirty(self) -> None:
+        """
+        Clears the clean flag in the header before the first change after a
+        flush.
+        """
+        if self._clean:
+            self._clean = 0
+            struct.pack_into('<H', self._mm, _CLEAN_OFFSET, 0)
+
+    def _grow(self, capacity: int) -> None:
+        """
+        Extends the file to hold capacity records and maps it again.
+        """
+        self._mm.flush()
+        self._mm.close()
+        self._file.truncate(_HEADER_SIZE + capacity * self._record.size)
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+        self._capacity = capacity
+        struct.pack_into('<Q', self._mm, _COUNT_OFFSET + 8, capacity)
+
+    def _recover(self) -> None:
+        """
+        Restores a file that was not flushed: from its snapshot if the
+        snapshot is at least as new as the last flush, otherwise by
+        re-heapifying the stored records.  Records that were being moved when
+        the process stopped may be lost in the latter case.  The snapshot is
+        copied to a temporary file that is synced and then renamed over the
+        heap file, so a crash during the copy leaves the dirty file in place.
+        """
+        snapshot_path = self._path + '.snapshot'
+        if _snapshot_generation(snapshot_path) >= self._generation:
+            temp_path = self._path + '.tmp'
+            shutil.copyfile(snapshot_path, temp_path)
+            with open(temp_path, 'rb') as file:
+                os.fsync(file.fileno())
+            self._mm.close()
+            self._file.close()
+            os.replace(temp_path, self._path)
+            _fsync_directory(self._path)
+            self._file = open(self._path, 'r+b')
+            self._mm = mmap.mmap(self._file.fileno(), 0)
+            magic, version, clean, record_size, count, capacity, generation = _HEADER.unpack_from(self._mm, 0)
+            self._count = count
+            self._capacity = capacity
+            self._clean = clean
+            self._generation = generation
+        else:
+            self._count = min(self._count, self._capacity)
+            for parent in range((self._count - 2) // 2, -1, -1):
+                self._sift_down(parent, self._get(parent))
+            self._store_count()
+        self.flush()
+
+
+def _pack_header(record_format: str, record_size: int, count: int, capacity: int, clean: bool,
+                 generation: int) -> bytes:
+    """
+    Returns the bytes of a file header.
+    """
+    header = _HEADER.pack(_MAGIC, _VERSION, 1 if clean else 0, record_size, count, capacity, generation)
+    header += record_format.encode('ascii').ljust(_FORMAT_SIZE, b'\0')
+    return header.ljust(_HEADER_SIZE, b'\0')
+
+
+def _snapshot_generation(snapshot_path: str) -> int:
+    """
+    Returns the generation stored in a snapshot, or -1 if there is no
+    readable snapshot or it is shorter than its header claims.
+    """
+    try:
+        with open(snapshot_path, 'rb') as file:
+            header = file.read(_HEADER.size)
+            length = os.fstat(file.fileno()).st_size
+    except OSError:
+        return -1
+    if len(header) < _HEADER.size:
+        return -1
+    magic, version, clean, record_size, count, capacity, generation = _HEADER.unpack(header)
+    if (magic != _MAGIC or version != _VERSION or count > capacity
+            or length < _HEADER_SIZE + capacity * record_size):
+        return -1
+    return generation
+
+
+def _fsync_directory(path: str) -> None:
+    """
+    Syncs the directory containing path so a rename into it is durable.
+    """
+    directory = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(directory)
+    finally:
+        os.close(directory)
@@ -0,0 +1,260 @@
+import numpy as np
+
+from min_heap import MinHeapException
+from dynamic_array import DynamicArray
+
+
+class NumericMinHeap:
+    """
+    Binary min heap of numbers stored in a contiguous NumPy array.  Bulk
+    operations (build_heap, push_many, pop_many, heapsort) work on whole
+    tree levels or partitions at once instead of one value at a time.
+    """
+
+    def __init__(self, start_heap=None, dtype=np.float64):
+        """
+        Initialize a new NumericMinHeap holding values of the given dtype
+        """
+        self._dtype = np.dtype(dtype)
+        self._data = np.empty(4, dtype=self._dtype)
+        self._size = 0
+        if start_heap is not None:
+            self.push_many(start_heap)
+
+    def __str__(self) -> str:
+        """
+        Return heap content in human-readable form
+        """
+        return 'HEAP ' + str(self._data[:self._size].tolist())
+
+    def add(self, node) -> None:
+        """
+        Adds a new value to the heap while maintaining heap property.
+        """
+        self._reserve(self._size + 1)
+        self._data[self._size] = node
+        self._size += 1
+        _sift_up(self._data, self._size - 1)
+
+    def is_empty(self) -> bool:
+        """
+        Returns true if the heap is empty, otherwise will return False
+        """
+        return self._size == 0
+
+    def get_min(self):
+        """
+        Returns the minimum value without removing it from the heap.
+        If the heap is empty, the method raises a MinHeapException
+        """
+        if self._size == 0:
+            raise MinHeapException
+        return self._data[0]
+
+    def remove_min(self):
+        """
+        Returns the minimum value, and removes it from the heap.
+        If the heap is empty, the method raises a MinHeapException
+        """
+        if self._size == 0:
+            raise MinHeapException
+        data = self._data
+        minimum = data[0]
+        self._size -= 1
+        if self._size > 0:
+            data[0] = data[self._size]
+            _sift_down(data, 0, self._size)
+        return minimum
+
+    def build_heap(self, values) -> None:
+        """
+        Replaces the contents of the heap with the passed values (an ndarray,
+        DynamicArray or any iterable of numbers) and heapifies them level by
+        level with vectorized operations.
+        """
+        values = _as_array(values, self._dtype)
+        self._data = np.empty(max(4, values.size), dtype=self._dtype)
+        self._data[:values.size] = values
+        self._size = values.size
+        _heapify_levels(self._data, self._size)
+
+    def push_many(self, values) -> None:
+        """
+        Adds every passed value to the heap.  The batch is copied in as one
+        block; if it is large compared with the heap the whole array is
+        re-heapified, otherwise only the new values are percolated up.
+        """
+        values = _as_array(values, self._dtype)
+        start = self._size
+        self._reserve(start + values.size)
+        self._data[start:start + values.size] = values
+        self._size += values.size
+        if values.size * 2 >= self._size:
+            _heapify_levels(self._data, self._size)
+        else:
+            for index in range(start, self._size):
+                _sift_up(self._data, index)
+
+    def pop_many(self, k: int) -> np.ndarray:
+        """
+        Removes up to k minimum values and returns them as an ndarray in
+        ascending order.  Large batches are selected with a single partition
+        followed by a rebuild of the remaining values.  If k is negative, the
+        method raises a MinHeapException.
+        """
+        if k < 0:
+            raise MinHeapException
+        k = min(k, self._size)
+        if k * self._size.bit_length() < self._size:
+            result = np.empty(k, dtype=self._dtype)
+            for index in range(k):
+                result[index] = self.remove_min()
+            return result
+
+        if k == 0:
+            return np.empty(0, dtype=self._dtype)
+        data = self._data[:self._size]
+        data.partition(k - 1)
+        result = np.sort(data[:k])
+        remaining = self._size - k
+        data[:remaining] = data[k:].copy()
+        self._size = remaining
+        _heapify_levels(self._data, self._size)
+        return result
+
+    def size(self) -> int:
+        """
+        Returns the number of values currently stored in the heap.
+        """
+        return self._size
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the heap.
+        """
+        self._data = np.empty(4, dtype=self._dtype)
+        self._size = 0
+
+    def to_array(self) -> np.ndarray:
+        """
+        Returns a copy of the stored values in heap order.
+        """
+        return self._data[:self._size].copy()
+
+    def memoryview(self) -> memoryview:
+        """
+        Returns a read-only memoryview of the stored values in heap order
+        without copying them.  It is only valid until the heap is changed.
+        """
+        view = self._data[:self._size].view()
+        view.flags.writeable = False
+        return memoryview(view)
+
+    def _reserve(self, capacity: int) -> None:
+        """
+        Doubles the backing array until it can hold capacity values.
+        """
+        if capacity <= self._data.size:
+            return
+        new_capacity = self._data.size
+        while new_capacity < capacity:
+            new_capacity *= 2
+        new_data = np.empty(new_capacity, dtype=self._dtype)
+        new_data[:self._size] = self._data[:self._size]
+        self._data = new_data
+
+
+def numeric_heapsort(values) -> None:
+    """
+    Sorts an ndarray in place, or a DynamicArray of numbers through an ndarray
+    copy, in non ascending order using NumPy's heapsort.
+    """
+    if isinstance(values, np.ndarray):
+        # Sorting the reversed view ascending leaves the array descending
+        values[::-1].sort(kind='heapsort')
+        return
+
+    data = _as_array(values, None)
+    data[::-1].sort(kind='heapsort')
+    for index in range(data.size):
+        values.set_at_index(index, data[index].item())
+
+
+def _as_array(values, dtype) -> np.ndarray:
+    """
+    Returns the passed values as a one-dimensional ndarray of dtype.
+    """
+    if isinstance(values, DynamicArray):
+        values = [values.get_at_index(index) for index in range(values.length())]
+    elif not isinstance(values, np.ndarray):
+        values = list(values)
+    return np.asarray(values, dtype=dtype).reshape(-1)
+
+
+def _heapify_levels(data: np.ndarray, end: int) -> None:
+    """
+    Floyd's bottom-up construction over data[:end], processing each tree level
+    as one batch.  Subtrees rooted on the same level are disjoint, so all of
+    their sifts can advance together, one vectorized step per level below.
+    """
+    if end < 2:
+        return
+    last_parent = (end - 2) // 2
+    # Walk the levels that hold parents from the deepest one up to the root
+    for level in range((last_parent + 1).bit_length() - 1, -1, -1):
+        level_start = (1 << level) - 1
+        level_end = min(2 * level_start + 1, last_parent + 1)
+        positions = np.arange(level_start, level_end)
+        while positions.size:
+            left = 2 * positions + 1
+            inside = left < end
+            positions = positions[inside]
+            left = left[inside]
+            # Pick the smaller child of every position
+            right = left + 1
+            children = left.copy()
+            has_right = right < end
+            right = right[has_right]
+            children[has_right] = np.where(data[right] < data[left[has_right]], right, left[has_right])
+            # Swap the positions whose smaller child is less than them
+            swap = data[children] < data[positions]
+            positions = positions[swap]
+            children = children[swap]
+            values = data[positions].copy()
+            data[positions] = data[children]
+            data[children] = values
+            positions = children
+
+
+def _sift_up(data: np.ndarray, child: int) -> None:
+    """
+    Moves the value at the passed index up the heap, writing it once.
+    """
+    value = data[child]
+    hole = child
+    while hole > 0:
+        parent = (hole - 1) // 2
+        if not value < data[parent]:
+            break
+        data[hole] = data[parent]
+        hole = parent
+    data[hole] = value
+
+
+def _sift_down(data: np.ndarray, parent: int, end: int) -> None:
+    """
+    Moves the value at the passed index down the heap in data[:end],
+    writing it once.
+    """
+    value = data[parent]
+    hole = parent
+    child = 2 * hole + 1
+    while child < end:
+        if child + 1 < end and data[child + 1] < data[child]:
+            child += 1
+        if not data[child] < value:
+            break
+        data[hole] = data[child]
+        hole = child
+        child = 2 * hole + 1
+    data[hole] = value
@@ -0,0 +1,179 @@
+from min_heap import *
+
+
+class PairingHandle:
+    """
+    Node of a PairingHeap, returned by add() as a handle for decrease_key().
+    The first child's prev is its parent; every later child's prev is its
+    left sibling.
+    """
+    __slots__ = ('_key', '_node', '_child', '_sibling', '_prev', '_heap')
+
+    def __init__(self, key: object, node: object, heap: "PairingHeap"):
+        self._key = key
+        self._node = node
+        self._child = None
+        self._sibling = None
+        self._prev = None
+        # Heap the node is stored in, None once it has been removed
+        self._heap = heap
+
+
+class PairingHeap:
+    """
+    Heap-ordered multiway tree restructured by pairing.  add() and
+    decrease_key() are O(1), since they only link a tree to the root, and
+    remove_min() is O(log n) amortized: the root's children are linked in
+    pairs from left to right and the pairs are then folded from right to
+    left.  This suits workloads with many decrease_key() calls.
+    """
+
+    def __init__(self, start_heap=None):
+        """
+        Initialize a new PairingHeap
+        """
+        self._root = None
+        self._size = 0
+
+        # populate the heap with initial values (if provided)
+        if start_heap:
+            for node in start_heap:
+                self.add(node)
+
+    def __str__(self) -> str:
+        """
+        Return heap content in human-readable form (in preorder)
+        """
+        heap_data = []
+        stack = [] if self._root is None else [self._root]
+        while stack:
+            entry = stack.pop()
+            heap_data.append(entry._node)
+            if entry._sibling is not None:
+                stack.append(entry._sibling)
+            if entry._child is not None:
+                stack.append(entry._child)
+        return 'PAIRING_HEAP ' + str(heap_data)
+
+    def add(self, node: object, priority: object = None) -> PairingHandle:
+        """
+        Adds a new object to the heap, ordered by priority, or by the node
+        itself if no priority is passed.  Returns a PairingHandle for the node.
+        """
+        handle = PairingHandle(node if priority is None else priority, node, self)
+        self._root = handle if self._root is None else _link(self._root, handle)
+        self._size += 1
+        return handle
+
+    def is_empty(self) -> bool:
+        """
+        Returns true if the heap is empty, otherwise will return False
+        """
+        return self._size == 0
+
+    def size(self) -> int:
+        """
+        Returns the number of items currently stored in the heap.
+        """
+        return self._size
+
+    def get_min(self) -> object:
+        """
+        Returns an object with the minimum key, without removing it from the heap.
+        If the heap is empty, the method raises a MinHeapException
+        """
+        if self._root is None:
+            raise MinHeapException
+        return self._root._node
+
+    def remove_min(self) -> object:
+        """
+        Returns an object with the minimum key, and removes it from the heap.
+        If the heap is empty, the method raises a MinHeapException
+        """
+        root = self._root
+        if root is None:
+            raise MinHeapException
+        self._root = _merge_pairs(root._child)
+        root._child = None
+        root._heap = None
+        self._size -= 1
+        return root._node
+
+    def decrease_key(self, handle: PairingHandle, key: object) -> None:
+        """
+        Lowers the key of the node referenced by handle by cutting its subtree
+        out and linking it to the root.  A handle that is not stored in this
+        heap or a greater key raises a MinHeapException.
+        """
+        if not isinstance(handle, PairingHandle) or handle._heap is not self or handle._key < key:
+            raise MinHeapException
+        handle._key = key
+        if handle is self._root:
+            return
+        # Unlink the subtree from its parent or left sibling
+        if handle._prev._child is handle:
+            handle._prev._child = handle._sibling
+        else:
+            handle._prev._sibling = handle._sibling
+        if handle._sibling is not None:
+            handle._sibling._prev = handle._prev
+        handle._sibling = None
+        handle._prev = None
+        self._root = _link(self._root, handle)
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the heap.
+        """
+        self._root = None
+        self._size = 0
+
+
+def _link(first: PairingHandle, second: PairingHandle) -> PairingHandle:
+    """
+    Makes the tree with the larger root the leftmost child of the other root
+    and returns the root of the linked tree.  Sibling links of the two roots
+    are not kept.
+    """
+    if second._key < first._key:
+        first, second = second, first
+    second._sibling = first._child
+    if first._child is not None:
+        first._child._prev = second
+    second._prev = first
+    first._child = second
+    return first
+
+
+def _merge_pairs(first: PairingHandle) -> PairingHandle:
+    """
+    Links a list of sibling trees into one and returns its root (None for
+    an empty list).  The first pass links them in pairs from left to right,
+    pushing each pair on a stack chained through the sibling links; the
+    second pass folds the stack, so the pairs are linked from right to left.
+    """
+    stack = None
+    while first is not None:
+        second = first._sibling
+        if second is None:
+            following = None
+            merged = first
+        else:
+            following = second._sibling
+            merged = _link(first, second)
+        merged._sibling = stack
+        stack = merged
+        first = following
+
+    if stack is None:
+        return None
+    root = stack
+    stack = stack._sibling
+    while stack is not None:
+        following = stack._sibling
+        root = _link(root, stack)
+        stack = following
+    root._sibling = None
+    root._prev = None
+    return root
@@ -0,0 +1,77 @@
+import array
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from dynamic_array import _typecode_of
+from min_heap import *
+
+
+# Arrays shorter than this are sorted in the calling process
+_MIN_PARALLEL_SIZE = 10000
+
+
+def parallel_heapsort(da: DynamicArray, workers: int = None) -> None:
+    """
+    Sorts a DynamicArray in non ascending order (like heapsort) using several
+    processes.  The array is split into one chunk per worker, each chunk is
+    heapsorted in a process pool, and the sorted chunks are combined with a
+    heap-based k-way merge.  Chunks of plain ints or floats are shipped as
+    packed binary buffers instead of pickled lists.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    length = da.length()
+    if workers <= 1 or length < _MIN_PARALLEL_SIZE:
+        heapsort(da)
+        return
+
+    # Split the array into contiguous chunks of (almost) equal size
+    chunk_size = -(-length // workers)
+    chunks = []
+    for start in range(0, length, chunk_size):
+        values = [da.get_at_index(index) for index in range(start, min(start + chunk_size, length))]
+        chunks.append(_pack(values))
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        sorted_chunks = [_unpack(*packed) for packed in pool.map(_sort_chunk, chunks)]
+
+    # Each chunk is in non ascending order, so merge in reverse
+    index = 0
+    for value in merge_sorted(*sorted_chunks, reverse=True):
+        da.set_at_index(index, value)
+        index += 1
+
+
+def _sort_chunk(packed: tuple) -> tuple:
+    """
+    Worker entry point: heapsorts one packed chunk and returns it packed the
+    same way.
+    """
+    typecode, payload = packed
+    chunk = DynamicArray(_unpack(typecode, payload))
+    heapsort(chunk)
+    return _pack([chunk.get_at_index(index) for index in range(chunk.length())], typecode)
+
+
+def _pack(values: list, typecode: str = None) -> tuple:
+    """
+    Returns a (typecode, payload) pair for a list of values.  Lists of plain
+    ints that fit in 64 bits or of plain floats become the bytes of an
+    array.array; anything else is passed on as the list itself.
+    """
+    if typecode is None:
+        typecode = _typecode_of(values)
+    if typecode is None:
+        return None, values
+    return typecode, array.array(typecode, values).tobytes()
+
+
+def _unpack(typecode: str, payload) -> object:
+    """
+    Reverses _pack, returning a sequence of the original values.
+    """
+    if typecode is None:
+        return payload
+    values = array.array(typecode)
+    values.frombytes(payload)
+    return values
@@ -0,0 +1,151 @@
+from min_heap import *
+
+
+class RadixHeap:
+    """
+    Priority queue for non-negative integer keys that are monotone: a key
+    added must be no smaller than the last minimum removed, as in Dijkstra's
+    algorithm or event simulation.  Bucket 0 holds the keys equal to the last
+    minimum and bucket i the keys whose highest bit differing from it is bit
+    i - 1.  Each entry only moves to lower buckets, so add() is O(1) and
+    remove_min() O(log C) amortized, where C is the largest key difference.
+    """
+
+    def __init__(self, start_heap=None):
+        """
+        Initialize a new RadixHeap
+        """
+        self._last = 0
+        self._size = 0
+        # Parallel key and node arrays per bucket
+        self._keys = DynamicArray()
+        self._nodes = DynamicArray()
+        self._add_bucket()
+
+        # populate the heap with initial values (if provided)
+        if start_heap:
+            for node in start_heap:
+                self.add(node)
+
+    def __str__(self) -> str:
+        """
+        Return heap content in human-readable form, bucket by bucket
+        """
+        buckets = [[self._nodes[i][j] for j in range(self._nodes[i].length())]
+                   for i in range(self._nodes.length())]
+        return 'RADIX_HEAP ' + str(buckets)
+
+    def add(self, node: object, priority: int = None) -> None:
+        """
+        Adds a new object to the heap, ordered by priority, or by the node
+        itself if no priority is passed.  A key that is not an int or is
+        smaller than the last removed minimum raises a MinHeapException.
+        """
+        key = node if priority is None else priority
+        if not isinstance(key, int) or key < self._last:
+            raise MinHeapException
+        bucket = (key ^ self._last).bit_length()
+        while bucket >= self._keys.length():
+            self._add_bucket()
+        self._keys.get_at_index(bucket).append(key)
+        self._nodes.get_at_index(bucket).append(node)
+        self._size += 1
+
+    def is_empty(self) -> bool:
+        """
+        Returns true if the heap is empty, otherwise will return False
+        """
+        return self._size == 0
+
+    def size(self) -> int:
+        """
+        Returns the number of items currently stored in the heap.
+        """
+        return self._size
+
+    def get_min(self) -> object:
+        """
+        Returns an object with the minimum key, without removing it from the heap.
+        If the heap is empty, the method raises a MinHeapException
+        """
+        if self._size == 0:
+            raise MinHeapException
+        self._fill_first_bucket()
+        nodes = self._nodes.get_at_index(0)
+        return nodes.get_at_index(nodes.length() - 1)
+
+    def get_min_key(self) -> int:
+        """
+        Returns the minimum key.
+        If the heap is empty, the method raises a MinHeapException
+        """
+        if self._size == 0:
+            raise MinHeapException
+        self._fill_first_bucket()
+        return self._last
+
+    def remove_min(self) -> object:
+        """
+        Returns an object with the minimum key, and removes it from the heap.
+        If the heap is empty, the method raises a MinHeapException
+        """
+        if self._size == 0:
+            raise MinHeapException
+        self._fill_first_bucket()
+        keys = self._keys.get_at_index(0)
+        nodes = self._nodes.get_at_index(0)
+        last = nodes.length() - 1
+        node = nodes.get_at_index(last)
+        keys.remove_at_index(last)
+        nodes.remove_at_index(last)
+        self._size -= 1
+        return node
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the heap.  Any key can be added again.
+        """
+        self._last = 0
+        self._size = 0
+        self._keys = DynamicArray()
+        self._nodes = DynamicArray()
+        self._add_bucket()
+
+    # -----------------------------------------------------------------------
+
+    def _add_bucket(self) -> None:
+        """
+        Appends an empty bucket.
+        """
+        self._keys.append(DynamicArray())
+        self._nodes.append(DynamicArray())
+
+    def _fill_first_bucket(self) -> None:
+        """
+        If bucket 0 is empty, makes the smallest key of the first non-empty
+        bucket the new last minimum and spreads that bucket over the lower
+        buckets.  The smallest key lands in bucket 0 and every other key in a
+        bucket below the one it came from.
+        """
+        if not self._keys.get_at_index(0).is_empty():
+            return
+        bucket = 1
+        while self._keys.get_at_index(bucket).is_empty():
+            bucket += 1
+        keys = self._keys.get_at_index(bucket)
+        nodes = self._nodes.get_at_index(bucket)
+        self._keys.set_at_index(bucket, DynamicArray())
+        self._nodes.set_at_index(bucket, DynamicArray())
+
+        get_key = keys.get_at_index
+        last = get_key(0)
+        for index in range(1, keys.length()):
+            key = get_key(index)
+            if key < last:
+                last = key
+        self._last = last
+        for index in range(keys.length()):
+            key = get_key(index)
+            target = (key ^ last).bit_length()
+            self._keys.get_at_index(target).append(key)
+            self._nodes.get_at_index(target).append(nodes.get_at_index(index))
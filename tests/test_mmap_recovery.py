@@ -0,0 +1,89 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from min_heap import MinHeapException
+from mmap_heap import MappedMinHeap, _HEADER_SIZE
+
+
+def crash(heap: MappedMinHeap) -> None:
+    """
+    Unmaps a heap without flushing it, as if the process had stopped.
+    """
+    heap._mm.close()
+    heap._file.close()
+
+
+class MappedRecoveryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.work_dir, 'heap.bin')
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def test_stale_snapshot_is_not_restored(self):
+        heap = MappedMinHeap.open(self.path, '<dq', 4)
+        for index in range(10):
+            heap.add((float(index), index))
+        heap.snapshot()
+        for index in range(10, 20):
+            heap.add((float(-index), index))
+        # The flush makes the snapshot older than the file
+        heap.flush()
+        heap.add((100.0, 100))
+        crash(heap)
+
+        heap = MappedMinHeap.open(self.path, '<dq')
+        self.assertEqual(heap.size(), 21)
+        removed = [heap.remove_min()[1] for _ in range(21)]
+        self.assertEqual(removed, list(range(19, 9, -1)) + list(range(10)) + [100])
+        heap.close()
+
+    def test_current_snapshot_is_restored(self):
+        heap = MappedMinHeap.open(self.path, '<dq')
+        heap.add((1.0, 1))
+        heap.snapshot()
+        heap.add((0.0, 0))
+        crash(heap)
+
+        heap = MappedMinHeap.open(self.path, '<dq')
+        self.assertEqual(heap.size(), 1)
+        self.assertEqual(heap.get_min(), (1.0, 1))
+        heap.close()
+
+    def test_truncated_file_is_rejected(self):
+        heap = MappedMinHeap.open(self.path, '<dq', 100)
+        for index in range(100):
+            heap.add((float(index), index))
+        heap.close()
+        # A copy cut short after 10 records still has a clean header
+        with open(self.path, 'r+b') as file:
+            file.truncate(_HEADER_SIZE + 10 * 16)
+
+        with self.assertRaises(MinHeapException):
+            MappedMinHeap.open(self.path, '<dq')
+
+    def test_truncated_snapshot_is_ignored(self):
+        heap = MappedMinHeap.open(self.path, '<dq', 100)
+        for index in range(100):
+            heap.add((float(index), index))
+        snapshot_path = heap.snapshot()
+        heap.add((-1.0, -1))
+        crash(heap)
+        with open(snapshot_path, 'r+b') as file:
+            file.truncate(_HEADER_SIZE + 10 * 16)
+
+        heap = MappedMinHeap.open(self.path, '<dq')
+        self.assertEqual(heap.size(), 101)
+        self.assertEqual(heap.remove_min(), (-1.0, -1))
+        heap.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
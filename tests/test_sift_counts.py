@@ -0,0 +1,101 @@
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from min_heap import *
+
+
+# Size of the heaps the counts are taken on, and number of remove_min calls
+# counted on each
+HEAP_SIZE = 10 ** 6
+REMOVALS = 20000
+
+
+class Counters:
+    """
+    Comparison and write counts shared by the wrappers below.
+    """
+
+    def __init__(self):
+        self.comparisons = 0
+        self.writes = 0
+
+
+class CountedValue:
+    """
+    Value whose comparisons are counted.
+    """
+    __slots__ = ('value', 'counters')
+
+    def __init__(self, value: float, counters: Counters):
+        self.value = value
+        self.counters = counters
+
+    def __lt__(self, other: "CountedValue") -> bool:
+        self.counters.comparisons += 1
+        return self.value < other.value
+
+
+class CountingArray(DynamicArray):
+    """
+    DynamicArray whose element writes are counted.
+    """
+    __slots__ = ('counters',)
+
+    def set_at_index(self, index: int, value: object) -> None:
+        self.counters.writes += 1
+        DynamicArray.set_at_index(self, index, value)
+
+
+def _count_removals(values: list, bottom_up: bool) -> Counters:
+    """
+    Heapifies HEAP_SIZE counted values and returns the comparisons and writes
+    of REMOVALS remove_min calls.  Checks that the minimums come out in order.
+    """
+    counters = Counters()
+    da = CountingArray()
+    da.counters = counters
+    da.extend([CountedValue(value, counters) for value in values])
+    heap = MinHeap.from_iterable(bottom_up=bottom_up)
+    heap.build_heap(da, copy=False)
+
+    counters.comparisons = counters.writes = 0
+    removed = [heap.remove_min().value for _ in range(REMOVALS)]
+    if removed != sorted(values)[:REMOVALS]:
+        raise AssertionError('remove_min returned the minimums out of order')
+    return counters
+
+
+class TestSiftCounts(unittest.TestCase):
+    """
+    The hole-based sift writes each level once, and the bottom-up sift needs
+    roughly half the comparisons of the top-down sift on a 10^6-element heap.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        rng = random.Random(0)
+        values = [rng.random() for _ in range(HEAP_SIZE)]
+        cls.top_down = _count_removals(values, False)
+        cls.bottom_up = _count_removals(values, True)
+
+    def test_bottom_up_halves_comparisons(self):
+        self.assertLess(self.bottom_up.comparisons, 0.6 * self.top_down.comparisons)
+
+    def test_top_down_comparisons(self):
+        # Two comparisons per level of the 20-level heap at most
+        self.assertLessEqual(self.top_down.comparisons, REMOVALS * 2 * HEAP_SIZE.bit_length())
+
+    def test_one_write_per_level(self):
+        # One write per level, plus the last value moved to the root and the
+        # hole filled at the end
+        levels = HEAP_SIZE.bit_length()
+        self.assertLessEqual(self.top_down.writes, REMOVALS * (levels + 2))
+        self.assertLessEqual(self.bottom_up.writes, REMOVALS * (levels + 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
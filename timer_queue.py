@@ -0,0 +1,276 @@
+import asyncio
+
+from min_heap import *
+
+
+class TimerHandle:
+    """
+    Timer scheduled in a TimerQueue.  Pass it to TimerQueue.cancel() to stop
+    the callback from being returned by pop_due().
+    """
+    __slots__ = ('deadline', 'callback', '_order', '_heap_handle', '_pending')
+
+    def __init__(self, deadline: float, callback, order: int):
+        self.deadline = deadline
+        self.callback = callback
+        # Scheduling number that orders timers with equal deadlines
+        self._order = order
+        # HeapHandle while the timer is stored in the heap
+        self._heap_handle = None
+        # False once the timer has been cancelled or returned by pop_due()
+        self._pending = True
+
+
+class TimerQueue:
+    """
+    Queue of callbacks ordered by deadline, stored in an addressable keyed
+    MinHeap; timers with equal deadlines fire in the order they were
+    scheduled.  Cancelled timers are left in the heap as tombstones.
+
+    If a resolution is passed, timers due within slots ** levels ticks of
+    resolution are first kept in a hierarchical timing wheel: scheduling
+    them is O(1), and they only enter the heap once pop_due() reaches their
+    tick, so short-lived timers that are cancelled early never touch it.
+    """
+
+    def __init__(self, resolution: float = None, slots: int = 256, levels: int = 2):
+        """
+        Initialize a new TimerQueue.  A resolution that is not positive, fewer
+        than 2 slots or no levels raise a MinHeapException.
+        """
+        if resolution is not None and (resolution <= 0 or slots < 2 or levels < 1):
+            raise MinHeapException
+        self._heap = MinHeap.from_iterable(addressable=True)
+        self._size = 0
+        self._scheduled = 0
+        self._resolution = resolution
+        self._slots = slots
+        self._levels = levels
+        # Tick the wheel has been advanced to, set by the first pop_due()
+        self._tick = None
+        self._wheels = None
+        if resolution is not None:
+            self._wheels = [[[] for _ in range(slots)] for _ in range(levels)]
+
+    def schedule(self, deadline: float, callback) -> TimerHandle:
+        """
+        Schedules callback to be returned by pop_due() once its deadline has
+        been reached.  Returns a TimerHandle that can be passed to cancel().
+        """
+        timer = TimerHandle(deadline, callback, self._scheduled)
+        self._scheduled += 1
+        self._size += 1
+        self._insert(timer)
+        return timer
+
+    def cancel(self, timer: TimerHandle) -> bool:
+        """
+        Cancels a pending timer in O(1).  Returns False if the timer has
+        already been returned by pop_due() or cancelled.
+        """
+        if not timer._pending:
+            return False
+        timer._pending = False
+        self._size -= 1
+        if timer._heap_handle is not None:
+            self._heap.cancel(timer._heap_handle)
+            timer._heap_handle = None
+        return True
+
+    def pop_due(self, now: float) -> DynamicArray:
+        """
+        Removes every timer whose deadline is not after now and returns their
+        callbacks in a DynamicArray, in deadline order.
+        """
+        if self._wheels is not None:
+            self._advance(int(now // self._resolution))
+        heap = self._heap
+        due = DynamicArray()
+        while not heap.is_empty() and not now < heap.get_min().deadline:
+            timer = heap.remove_min()
+            due.append(timer.callback)
+            timer._pending = False
+            timer._heap_handle = None
+        self._size -= due.length()
+        return due
+
+    def next_deadline(self) -> float:
+        """
+        Returns the earliest deadline of the pending timers, or None if there
+        are none.
+        """
+        earliest = None
+        if not self._heap.is_empty():
+            earliest = self._heap.get_min().deadline
+        if self._wheels is not None and self._tick is not None:
+            for level in range(self._levels):
+                deadline = self._earliest_in_level(level)
+                if deadline is not None and (earliest is None or deadline < earliest):
+                    earliest = deadline
+        return earliest
+
+    def is_empty(self) -> bool:
+        """
+        Returns true if no timer is pending, otherwise will return False
+        """
+        return self._size == 0
+
+    def size(self) -> int:
+        """
+        Returns the number of pending timers.
+        """
+        return self._size
+
+    # -----------------------------------------------------------------------
+
+    def _insert(self, timer: TimerHandle) -> None:
+        """
+        Stores a timer in the wheel level that covers its tick, or in the heap
+        if it is due in the current tick or beyond the wheel.
+        """
+        if self._wheels is not None and self._tick is not None:
+            tick = int(timer.deadline // self._resolution)
+            delta = tick - self._tick
+            span = 1
+            for level in range(self._levels):
+                if delta < span:
+                    break
+                if delta < span * self._slots:
+                    self._wheels[level][(tick // span) % self._slots].append(timer)
+                    return
+                span *= self._slots
+        if self._wheels is None:
+            # The heap breaks ties in insertion order by itself
+            timer._heap_handle = self._heap.add(timer, timer.deadline)
+        else:
+            # Timers leave the wheel out of scheduling order
+            timer._heap_handle = self._heap.add(timer, (timer.deadline, timer._order))
+
+    def _advance(self, tick: int) -> None:
+        """
+        Moves the wheel forward to the passed tick.  Each tick empties its
+        level-0 bucket into the heap, and ticks that start a new block of a
+        higher level first spread that level's bucket over the lower levels.
+        """
+        if self._tick is None or tick - self._tick >= self._slots ** self._levels:
+            # The whole wheel is due: move every timer to the heap
+            self._tick = tick
+            for wheel in self._wheels:
+                for index in range(self._slots):
+                    self._redistribute(wheel, index)
+            return
+        slots = self._slots
+        while self._tick < tick:
+            self._tick += 1
+            # Find the highest level whose block starts at this tick
+            level = 0
+            span = slots
+            while level + 1 < self._levels and self._tick % span == 0:
+                level += 1
+                span *= slots
+            span //= slots
+            while level > 0:
+                self._redistribute(self._wheels[level], (self._tick // span) % slots)
+                level -= 1
+                span //= slots
+            self._redistribute(self._wheels[0], self._tick % slots)
+
+    def _redistribute(self, wheel: list, index: int) -> None:
+        """
+        Empties a bucket and stores each of its live timers again relative to
+        the current tick, dropping the cancelled ones.
+        """
+        bucket = wheel[index]
+        if not bucket:
+            return
+        wheel[index] = []
+        for timer in bucket:
+            if timer._pending:
+                self._insert(timer)
+
+    def _earliest_in_level(self, level: int) -> float:
+        """
+        Returns the earliest deadline stored in a wheel level, or None.
+        Buckets are visited in time order starting after the current one, so
+        the first bucket with a live timer holds the earliest of the level.
+        """
+        wheel = self._wheels[level]
+        start = (self._tick // self._slots ** level) % self._slots
+        for offset in range(1, self._slots + 1):
+            earliest = None
+            for timer in wheel[(start + offset) % self._slots]:
+                if timer._pending and (earliest is None or timer.deadline < earliest):
+                    earliest = timer.deadline
+            if earliest is not None:
+                return earliest
+        return None
+
+
+class AsyncTimerQueue(TimerQueue):
+    """
+    TimerQueue that calls its callbacks from an asyncio event loop.  Deadlines
+    are in the loop's clock (loop.time()).  run() sleeps until exactly the
+    next deadline and is woken early when an earlier timer is scheduled.
+    """
+
+    def __init__(self, resolution: float = None, slots: int = 256, levels: int = 2):
+        super().__init__(resolution, slots, levels)
+        self._waiter = None
+        self._sleep_deadline = None
+        self._running = False
+
+    def schedule(self, deadline: float, callback) -> TimerHandle:
+        """
+        Schedules callback to be called by run() once the loop's clock has
+        reached deadline.  Returns a TimerHandle that can be passed to cancel().
+        """
+        timer = super().schedule(deadline, callback)
+        if self._sleep_deadline is None or deadline < self._sleep_deadline:
+            self._wake()
+        return timer
+
+    async def run(self) -> None:
+        """
+        Calls the callbacks of due timers in deadline order until stop() is
+        called.  Exceptions raised by callbacks are passed to the loop's
+        exception handler.
+        """
+        loop = asyncio.get_running_loop()
+        self._running = True
+        while self._running:
+            for callback in self.pop_due(loop.time()):
+                try:
+                    callback()
+                except Exception as error:
+                    loop.call_exception_handler({
+                        'message': 'Exception in timer callback %r' % (callback,),
+                        'exception': error,
+                    })
+            if not self._running:
+                break
+            self._sleep_deadline = self.next_deadline()
+            self._waiter = loop.create_future()
+            alarm = None
+            if self._sleep_deadline is not None:
+                alarm = loop.call_at(self._sleep_deadline, self._wake)
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+                self._sleep_deadline = None
+                if alarm is not None:
+                    alarm.cancel()
+
+    def stop(self) -> None:
+        """
+        Makes run() return once its current batch of callbacks is done.
+        """
+        self._running = False
+        self._wake()
+
+    def _wake(self) -> None:
+        """
+        Wakes run() if it is sleeping.
+        """
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)